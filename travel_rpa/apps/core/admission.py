@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from . import metrics
+
+QUEUE_FULL = 'queue_full'
+TIMED_OUT = 'timeout'
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded FIFO wait queue for one endpoint.
+
+    ``acquire`` returns ``None`` once the caller may run (it must then call
+    ``release``), or the reason it was shed: the queue was already full, or
+    no slot freed up within ``wait_seconds``.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue: int, wait_seconds: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.wait_seconds = wait_seconds
+        self.active = 0
+        self.waiting_max = 0
+        # One ticket per queued caller, oldest first; only the head may take
+        # a freed slot, so callers are admitted in arrival order.
+        self._tickets = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self) -> Optional[str]:
+        with self._cond:
+            # Newcomers never overtake callers that are already queued.
+            if self.active < self.concurrency and not self._tickets:
+                self.active += 1
+                return None
+            if len(self._tickets) >= self.queue:
+                return QUEUE_FULL
+            ticket = object()
+            self._tickets.append(ticket)
+            self.waiting_max = max(self.waiting_max, len(self._tickets))
+            deadline = time.monotonic() + self.wait_seconds
+            try:
+                while self._tickets[0] is not ticket or self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return TIMED_OUT
+                    self._cond.wait(remaining)
+                self.active += 1
+                return None
+            finally:
+                self._tickets.remove(ticket)
+                # The head changed; let the next ticket check for a free slot.
+                self._cond.notify_all()
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            # notify() could wake a caller that is not at the head.
+            self._cond.notify_all()
+
+    def gauges(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                f"admission.{self.name}.active": self.active,
+                f"admission.{self.name}.queued": len(self._tickets),
+                f"admission.{self.name}.queued_max": self.waiting_max,
+            }
+
+
+_gates: Dict[str, AdmissionGate] = {}
+_gates_lock = threading.Lock()
+
+
+def get_gates() -> Dict[str, AdmissionGate]:
+    with _gates_lock:
+        if not _gates:
+            for name, limits in settings.ADMISSION_LIMITS.items():
+                _gates[name] = AdmissionGate(
+                    name, limits['concurrency'], limits['queue'], limits['wait_seconds']
+                )
+        return dict(_gates)
+
+
+def reset() -> None:
+    with _gates_lock:
+        _gates.clear()
+
+
+def gauges() -> Dict[str, int]:
+    """Current concurrency and queue depth per gate, for the metrics endpoint."""
+    snapshot = {}
+    for gate in get_gates().values():
+        snapshot.update(gate.gauges())
+    return snapshot
+
+
+class AdmissionControlMiddleware:
+    """Shed load on the webhook endpoints instead of letting requests pile up.
+
+    Each endpoint in ``ADMISSION_LIMITS`` has its own gate, so slow issuance
+    calls can only use their own budget and never hold the threads ingest
+    needs. A full queue gets ``429`` and a queue wait that runs out gets
+    ``503``, both with ``Retry-After`` so n8n backs off instead of timing out.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.ADMISSION_CONTROL:
+            return self.get_response(request)
+        name = self._gate_for(request.path)
+        if name is None:
+            return self.get_response(request)
+
+        gate = get_gates()[name]
+        shed = gate.acquire()
+        if shed is not None:
+            metrics.increment(f"admission.{name}.shed.{shed}")
+            retry_after = settings.ADMISSION_LIMITS[name]['retry_after']
+            response = JsonResponse({
+                'error': 'Too many requests' if shed == QUEUE_FULL else 'Service busy',
+                'retry_after': retry_after
+            }, status=429 if shed == QUEUE_FULL else 503)
+            response['Retry-After'] = str(retry_after)
+            return response
+
+        metrics.increment(f"admission.{name}.admitted")
+        try:
+            return self.get_response(request)
+        finally:
+            gate.release()
+
+    @staticmethod
+    def _gate_for(path: str) -> Optional[str]:
+        for name, limits in settings.ADMISSION_LIMITS.items():
+            if path == limits['path'] or path.startswith(limits['path'] + '/'):
+                return name
+        return None
@@ -0,0 +1,24 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class CoreConfig(AppConfig):
+    name = 'apps.core'
+
+    def ready(self):
+        from apps.extraction.fingerprint import SIMHASH_BANDS
+
+        # The band index only finds every candidate within SIMHASH_BANDS - 1 bits.
+        if not 0 <= settings.NEAR_DUPLICATE_MAX_DISTANCE < SIMHASH_BANDS:
+            raise ImproperlyConfigured(
+                f"NEAR_DUPLICATE_MAX_DISTANCE must be between 0 and {SIMHASH_BANDS - 1}"
+            )
+
+        # A request waiting on another delivery's claim still holds its
+        # admission slot; it must give up before queued requests would.
+        ingest_wait = settings.ADMISSION_LIMITS['ingest']['wait_seconds']
+        if settings.ADMISSION_CONTROL and settings.INGEST_CLAIM_WAIT_SECONDS >= ingest_wait:
+            raise ImproperlyConfigured(
+                f"INGEST_CLAIM_WAIT_SECONDS must be below the ingest admission wait ({ingest_wait}s)"
+            )
@@ -0,0 +1,164 @@
+"""Content-addressed storage for issuance artifacts (policy PDFs, screenshots, audits).
+
+Blobs are keyed by the sha256 of their uncompressed bytes, so storing the
+same file twice is a metadata lookup. Compressible content is gzipped on
+write and only kept that way when it saves space. Blobs go to the local
+filesystem or to GCS (``ARTIFACT_BACKEND``); the ``artifacts`` table keeps
+what the download endpoint needs without touching the backend.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+
+from .models import Artifact, Case
+
+# Formats that are already compressed are stored as-is.
+INCOMPRESSIBLE_TYPES = {'image/png', 'image/jpeg', 'image/webp', 'application/gzip', 'application/zip'}
+# Keep the gzipped blob only if it is at most this fraction of the original.
+MIN_COMPRESSION_RATIO = 0.9
+
+
+class LocalArtifactBackend:
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), 'rb')
+
+
+class GCSArtifactBackend:
+    def __init__(self, bucket: str, prefix: str = ''):
+        from google.cloud import storage
+        self.bucket = storage.Client().bucket(bucket)
+        self.prefix = prefix
+
+    def exists(self, key: str) -> bool:
+        return self.bucket.blob(self.prefix + key).exists()
+
+    def write(self, key: str, data: bytes) -> None:
+        from google.api_core.exceptions import PreconditionFailed
+        try:
+            # Content-addressed: if another worker won the race the blob is identical.
+            self.bucket.blob(self.prefix + key).upload_from_string(data, if_generation_match=0)
+        except PreconditionFailed:
+            pass
+
+    def open(self, key: str) -> BinaryIO:
+        return self.bucket.blob(self.prefix + key).open('rb')
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if settings.ARTIFACT_BACKEND == 'gcs':
+            _backend = GCSArtifactBackend(settings.ARTIFACT_GCS_BUCKET, settings.ARTIFACT_GCS_PREFIX)
+        elif settings.ARTIFACT_BACKEND == 'local':
+            _backend = LocalArtifactBackend(settings.ARTIFACT_LOCAL_DIR)
+        else:
+            raise ValueError(f"Unknown ARTIFACT_BACKEND: {settings.ARTIFACT_BACKEND}")
+    return _backend
+
+
+def reset_backend() -> None:
+    global _backend
+    _backend = None
+
+
+def put_artifact(data: bytes, content_type: str) -> Artifact:
+    """Store ``data`` once and return its metadata row."""
+    content_hash = hashlib.sha256(data).hexdigest()
+    artifact = Artifact.objects.filter(content_hash=content_hash).first()
+    if artifact is not None:
+        return artifact
+
+    stored, encoding = data, 'identity'
+    if content_type not in INCOMPRESSIBLE_TYPES:
+        compressed = gzip.compress(data, mtime=0)
+        if len(compressed) <= len(data) * MIN_COMPRESSION_RATIO:
+            stored, encoding = compressed, 'gzip'
+
+    backend = get_backend()
+    if not backend.exists(content_hash):
+        backend.write(content_hash, stored)
+    artifact, _ = Artifact.objects.get_or_create(
+        content_hash=content_hash,
+        defaults={
+            'content_type': content_type,
+            'size': len(data),
+            'encoding': encoding,
+            'stored_size': len(stored),
+        }
+    )
+    return artifact
+
+
+def open_artifact(artifact: Artifact, decode: bool = True) -> BinaryIO:
+    """Readable stream of the artifact; ``decode=False`` returns the stored (possibly gzipped) bytes."""
+    stream = get_backend().open(artifact.content_hash)
+    if decode and artifact.encoding == 'gzip':
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    return stream
+
+
+def artifact_url(artifact: Artifact) -> str:
+    path = reverse('artifact_download', args=[artifact.content_hash])
+    return f"{settings.ARTIFACT_BASE_URL.rstrip('/')}{path}"
+
+
+def store_issuance_artifacts(case: Case, result: dict) -> Dict[str, Optional[str]]:
+    """Store a driver's policy PDF, screenshot and an audit record; set the case URLs."""
+    urls = {'policy_pdf_url': None, 'screenshot_url': None, 'audit_json_url': None}
+    hashes = {}
+    if result.get('policy_pdf'):
+        pdf = put_artifact(result['policy_pdf'], 'application/pdf')
+        urls['policy_pdf_url'], hashes['policy_pdf'] = artifact_url(pdf), pdf.content_hash
+    if result.get('screenshot_png'):
+        screenshot = put_artifact(result['screenshot_png'], 'image/png')
+        urls['screenshot_url'], hashes['screenshot'] = artifact_url(screenshot), screenshot.content_hash
+
+    audit = {
+        'case_id': case.case_id,
+        'policy_number': result['simulated_policy_number'],
+        'issued_at': result['timestamp'],
+        'plan': case.plan,
+        'scope': case.scope,
+        'days': case.days,
+        'start_date': case.start_date,
+        'end_date': case.end_date,
+        'premium_total': case.premium_total,
+        'currency': case.currency,
+        'travellers': list(case.travellers.values('full_name', 'passport_number', 'date_of_birth')),
+        'artifacts': hashes,
+    }
+    audit_json = json.dumps(audit, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    urls['audit_json_url'] = artifact_url(put_artifact(audit_json, 'application/json'))
+
+    case.policy_pdf_url = urls['policy_pdf_url']
+    case.audit_json_url = urls['audit_json_url']
+    case.save(update_fields=['policy_pdf_url', 'audit_json_url', 'updated_at'])
+    return urls
@@ -0,0 +1,86 @@
+import zlib
+from io import BytesIO
+
+from django.conf import settings
+from django.http import JsonResponse
+
+
+class DecompressionError(Exception):
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+def _gunzip(data: bytes, limit: int) -> bytes:
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        out = decompressor.decompress(data, limit + 1)
+    except zlib.error as exc:
+        raise DecompressionError(f"Invalid gzip body: {exc}", 400)
+    if len(out) > limit or decompressor.unconsumed_tail:
+        raise DecompressionError('Decompressed body is too large', 413)
+    if not decompressor.eof:
+        raise DecompressionError('Truncated gzip body', 400)
+    return out
+
+
+def _unzstd(data: bytes, limit: int) -> bytes:
+    try:
+        import zstandard
+    except ImportError:
+        raise DecompressionError('zstd request bodies are not supported on this server', 415)
+    try:
+        # The bounded read enforces the size cap; decompressobj (which has no
+        # output cap) then decodes the same first frame and reports whether
+        # it was complete, which stream_reader does not.
+        with zstandard.ZstdDecompressor().stream_reader(BytesIO(data)) as reader:
+            if len(reader.read(limit + 1)) > limit:
+                raise DecompressionError('Decompressed body is too large', 413)
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        out = decompressor.decompress(data)
+    except zstandard.ZstdError as exc:
+        raise DecompressionError(f"Invalid zstd body: {exc}", 400)
+    if not decompressor.eof:
+        raise DecompressionError('Truncated zstd body', 400)
+    return out
+
+
+DECODERS = {
+    'gzip': _gunzip,
+    'x-gzip': _gunzip,
+    'zstd': _unzstd,
+}
+
+
+def decompress(data: bytes, encoding: str, limit: int) -> bytes:
+    """Decode a request body, never producing more than ``limit`` bytes."""
+    decoder = DECODERS.get(encoding.strip().lower())
+    if decoder is None:
+        raise DecompressionError(f"Unsupported Content-Encoding: {encoding}", 415)
+    return decoder(data, limit)
+
+
+class RequestDecompressionMiddleware:
+    """Accept ``Content-Encoding: gzip|zstd`` request bodies.
+
+    The compressed size is still bounded by ``DATA_UPLOAD_MAX_MEMORY_SIZE``;
+    the decoded body by ``REQUEST_MAX_DECOMPRESSED_BYTES`` (413 beyond it),
+    so a small compression bomb cannot expand in memory.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        encoding = request.META.get('HTTP_CONTENT_ENCODING')
+        if encoding and encoding.strip().lower() != 'identity':
+            try:
+                body = decompress(request.body, encoding, settings.REQUEST_MAX_DECOMPRESSED_BYTES)
+            except DecompressionError as exc:
+                return JsonResponse({'error': str(exc)}, status=exc.status)
+            # Parsers downstream see a plain body of the decoded length.
+            request._body = body
+            request._stream = BytesIO(body)
+            request.META['CONTENT_LENGTH'] = str(len(body))
+            del request.META['HTTP_CONTENT_ENCODING']
+        return self.get_response(request)
@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.local import Local
+from django.conf import settings
+
+from . import metrics
+
+PRIMARY_ALIAS = 'default'
+PIN_COOKIE = 'db_pin'
+
+_state = Local()
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica only inside ``replica_reads`` and before any write.
+
+    Everything else, including the ingest write path and reads that follow a
+    write in the same request, stays on the primary so it never sees
+    replication lag. ``ReplicaRoutingMiddleware`` extends that pin to the
+    client's next requests for ``DATABASE_REPLICA_PIN_SECONDS``. Without a
+    configured replica alias every read goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = PRIMARY_ALIAS
+        if (getattr(_state, 'read_only', False) and not getattr(_state, 'pinned', False)
+                and settings.DATABASE_REPLICA_ALIAS in settings.DATABASES):
+            alias = settings.DATABASE_REPLICA_ALIAS
+        metrics.increment(f'db.reads.{alias}')
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Stick to the primary for the rest of the request/unit of work.
+        _state.pinned = True
+        _state.wrote = True
+        metrics.increment(f'db.writes.{PRIMARY_ALIAS}')
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+@contextmanager
+def replica_reads():
+    """Allow reads in this block to use the replica until something is written."""
+    previous = getattr(_state, 'read_only', False)
+    _state.read_only = True
+    try:
+        yield
+    finally:
+        _state.read_only = previous
+
+
+def read_only_view(view):
+    """Decorator for views and exports that only read and may lag the primary."""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapped
+
+
+def reset_routing_state() -> None:
+    _state.read_only = False
+    _state.pinned = False
+    _state.wrote = False
+
+
+class ReplicaRoutingMiddleware:
+    """Scope primary pinning to a client instead of a thread.
+
+    Routing state is cleared between requests served by the same thread. A
+    request that wrote sets a short-lived ``db_pin`` cookie, and requests
+    carrying it start pinned to the primary, so a client reading back its
+    own write right after the response does not hit a lagging replica.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset_routing_state()
+        _state.pinned = PIN_COOKIE in request.COOKIES
+        try:
+            response = self.get_response(request)
+            if _state.wrote and settings.DATABASE_REPLICA_PIN_SECONDS > 0:
+                response.set_cookie(
+                    PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                    httponly=True, samesite='Lax'
+                )
+            return response
+        finally:
+            reset_routing_state()
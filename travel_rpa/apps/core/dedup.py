@@ -0,0 +1,63 @@
+from datetime import timedelta
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.extraction.fingerprint import (
+    facts_key, hamming_distance, normalize_body, simhash, simhash_bands
+)
+from .models import Case, EmailFingerprint
+
+
+class Fingerprint:
+    """Near-duplicate fingerprint of text already reduced by ``trim_email_body``."""
+
+    def __init__(self, text: str, passport_numbers: Iterable[str], terms: Optional[dict] = None):
+        self.facts_key = facts_key(text, passport_numbers, terms, trimmed=True)
+        self.simhash = simhash(normalize_body(text, trimmed=True))
+        self.bands = simhash_bands(self.simhash)
+
+
+def find_near_duplicate(fingerprint: Fingerprint) -> Optional[Tuple[Case, int]]:
+    """Return the closest recent case whose email is a near-duplicate, with its distance.
+
+    Candidates come from the per-band indexes, so the lookup cost depends on
+    the number of colliding fingerprints rather than on the size of the table.
+    Cases still being processed (no stored response yet) are skipped: there
+    is nothing to replay from them.
+    """
+    # Below SIMHASH_BANDS, checked at startup by CoreConfig.ready.
+    max_distance = settings.NEAR_DUPLICATE_MAX_DISTANCE
+
+    same_band = Q()
+    for i, band in enumerate(fingerprint.bands):
+        same_band |= Q(**{f'band{i}': band})
+    cutoff = timezone.now() - timedelta(hours=settings.NEAR_DUPLICATE_WINDOW_HOURS)
+    candidates = (
+        EmailFingerprint.objects
+        .filter(same_band, facts_key=fingerprint.facts_key, created_at__gte=cutoff,
+                case__response_json__isnull=False)
+        .select_related('case')
+    )
+
+    best = None
+    for candidate in candidates:
+        distance = hamming_distance(fingerprint.simhash, int(candidate.simhash, 16))
+        if distance <= max_distance and (best is None or distance < best[1]):
+            best = (candidate.case, distance)
+    return best
+
+
+def record_fingerprint(case: Case, message_id: str, fingerprint: Fingerprint) -> EmailFingerprint:
+    # get_or_create: a retried near-duplicate message is linked only once.
+    return EmailFingerprint.objects.get_or_create(
+        message_id=message_id,
+        defaults=dict(
+            case=case,
+            facts_key=fingerprint.facts_key,
+            simhash=f"{fingerprint.simhash:016x}",
+            **{f'band{i}': band for i, band in enumerate(fingerprint.bands)}
+        )
+    )[0]
@@ -0,0 +1,37 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+MEDIA_TYPE = 'application/msgpack'
+
+_json_encoder = DjangoJSONEncoder()
+
+
+def _default(value):
+    # Same conversions as the JSON responses (UUID, Decimal, dates).
+    return _json_encoder.default(value)
+
+
+class MessagePackParser(BaseParser):
+    media_type = MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        import msgpack
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, timestamp=3)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
@@ -0,0 +1,312 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import pytz
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+
+from apps.extraction.policy_extractor import extract_policy_data
+from apps.extraction.preprocess import trim_email_body
+from apps.pricing.engine import PricingEngine
+from . import passports, stats
+from .dedup import Fingerprint, find_near_duplicate, record_fingerprint
+from .models import Case, Traveller
+
+
+PROCESSING_ROUTE = 'processing'
+# Near-duplicate deliveries keep their own row so a retry replays the same reply.
+DUPLICATE_ROUTE = 'duplicate'
+CLAIM_POLL_SECONDS = 0.05
+
+
+def ingest(data: dict) -> Tuple[dict, int]:
+    """Run one email payload through dedup, extraction, pricing and storage.
+
+    Shared by the ``/ingest`` webhook and the spool ``ingest_worker``;
+    returns the response body and its HTTP status. The idempotency key is
+    claimed before any work is done, so concurrent deliveries of the same
+    email are processed once and the others replay that result.
+    """
+    idem_string = f"{data['message_id']}|{data.get('body', '')}"
+    idempotency_key = hashlib.sha256(idem_string.encode()).hexdigest()
+    
+    case, reply = _claim(data, idempotency_key)
+    if reply is not None:
+        return reply
+    
+    try:
+        return _process(case, data, idempotency_key)
+    except Exception:
+        # Release the claim so a retry can start over instead of waiting
+        # for a result that will never be written.
+        Case.objects.filter(pk=case.pk, route=PROCESSING_ROUTE).delete()
+        raise
+
+
+def _claim(data: dict, idempotency_key: str) -> Tuple[Optional[Case], Optional[Tuple[dict, int]]]:
+    """Atomically take ownership of an idempotency key.
+
+    Returns ``(case, None)`` when this caller inserted (or took over a stale)
+    ``processing`` row and must do the work, or ``(None, reply)`` with the
+    response to send: the stored result once the owner finishes, or a 409
+    if it is still running after ``INGEST_CLAIM_WAIT_SECONDS``. Ownership is
+    decided by the unique index on ``idempotency_key``, never by a prior
+    ``exists()`` check, so it holds across threads and instances.
+    """
+    deadline = time.monotonic() + settings.INGEST_CLAIM_WAIT_SECONDS
+    while True:
+        existing = (
+            Case.objects.filter(idempotency_key=idempotency_key)
+            .values_list('case_id', 'route', 'response_json', 'response_status', 'updated_at')
+            .first()
+        )
+        if existing is None:
+            try:
+                with transaction.atomic():
+                    return Case.objects.create(
+                        message_id=data['message_id'],
+                        thread_id=data.get('thread_id', data['message_id']),
+                        idempotency_key=idempotency_key,
+                        from_email=data.get('from', ''),
+                        subject=data.get('subject', ''),
+                        body=data.get('body', ''),
+                        received_at=data.get('received_at', datetime.now(pytz.UTC)),
+                        route=PROCESSING_ROUTE
+                    ), None
+            except IntegrityError:
+                if not Case.objects.filter(idempotency_key=idempotency_key).exists():
+                    other = (
+                        Case.objects.filter(message_id=data['message_id'])
+                        .values_list('case_id', flat=True).first()
+                    )
+                    if other is not None:
+                        return None, ({
+                            'error': 'message_id was already ingested with a different body',
+                            'case_id': str(other)
+                        }, status.HTTP_409_CONFLICT)
+            if time.monotonic() >= deadline:
+                break
+            continue
+        
+        case_id, route, response_json, response_status, updated_at = existing
+        if route != PROCESSING_ROUTE:
+            if response_json is not None:
+                return None, (json.loads(response_json), response_status)
+            return None, ({
+                'status': 'duplicate',
+                'case_id': str(case_id),
+                'idempotency_key': idempotency_key
+            }, status.HTTP_200_OK)
+        
+        stale_before = timezone.now() - timedelta(seconds=settings.INGEST_CLAIM_STALE_SECONDS)
+        if updated_at < stale_before:
+            # The owner died mid-way; compare-and-set on updated_at so only
+            # one waiter takes the claim over.
+            taken = Case.objects.filter(
+                pk=case_id, route=PROCESSING_ROUTE, updated_at=updated_at
+            ).update(updated_at=timezone.now())
+            if taken:
+                case = Case.objects.get(pk=case_id)
+                case.travellers.all().delete()
+                case.fingerprints.all().delete()
+                return case, None
+        
+        if time.monotonic() >= deadline:
+            return None, ({
+                'status': PROCESSING_ROUTE,
+                'case_id': str(case_id),
+                'idempotency_key': idempotency_key
+            }, status.HTTP_409_CONFLICT)
+        time.sleep(CLAIM_POLL_SECONDS)
+    
+    return None, ({
+        'status': PROCESSING_ROUTE,
+        'idempotency_key': idempotency_key
+    }, status.HTTP_409_CONFLICT)
+
+
+def _process(case: Case, data: dict, idempotency_key: str) -> Tuple[dict, int]:
+    parsed_passports = []
+    for ocr_text in data.get('ocr_results', []):
+        content_hash, parsed = passports.parse_passport(ocr_text)
+        if parsed:
+            parsed_passports.append((content_hash, passports.fill_from_previous(parsed)))
+    
+    trimmed = trim_email_body(data.get('body', ''), settings.EXTRACTION_MAX_SCAN_BYTES)
+    preprocessing = {
+        key: value for key, value in trimmed.items() if key != 'text'
+    }
+    
+    extracted = extract_policy_data(trimmed['text'], data.get('subject', ''))
+    
+    fingerprint = None
+    if settings.NEAR_DUPLICATE_DETECTION:
+        fingerprint = Fingerprint(
+            trimmed['text'],
+            [p['passport_number'] for _, p in parsed_passports],
+            extracted
+        )
+        near_duplicate = find_near_duplicate(fingerprint)
+        if near_duplicate:
+            existing_case, distance = near_duplicate
+            record_fingerprint(existing_case, data['message_id'], fingerprint)
+            case.route = DUPLICATE_ROUTE
+            return _finish(case, {
+                'status': 'duplicate',
+                'near_duplicate': True,
+                'distance': distance,
+                'case_id': str(existing_case.case_id),
+                'route': existing_case.route,
+                'idempotency_key': idempotency_key,
+                'result': json.loads(existing_case.response_json)
+            }, status.HTTP_200_OK)
+    
+    if not extracted['intent_ok']:
+        case.delete()
+        return {
+            'route': 'ignore',
+            'intent_ok': False
+        }, status.HTTP_200_OK
+    
+    case.direction = extracted.get('direction')
+    case.scope = extracted.get('scope')
+    case.plan = extracted.get('plan')
+    case.coverage_limit = extracted.get('coverage_limit')
+    case.start_date = extracted.get('start_date')
+    case.end_date = extracted.get('end_date')
+    case.days = extracted.get('days')
+    case.sports_coverage = extracted.get('sports_coverage', False)
+    case.intent_ok = True
+    
+    if fingerprint:
+        record_fingerprint(case, case.message_id, fingerprint)
+    
+    for content_hash, parsed in parsed_passports:
+        Traveller.objects.create(
+            case=case,
+            full_name=parsed['full_name'],
+            passport_number=parsed['passport_number'],
+            date_of_birth=parsed['date_of_birth'],
+            mrz_hash=content_hash
+        )
+    
+    if extracted.get('direction') == 'INBOUND':
+        required = ['direction', 'plan', 'days', 'start_date']
+    else:
+        required = ['direction', 'scope', 'plan', 'days', 'start_date']
+    
+    missing = []
+    for field in required:
+        val = extracted.get(field)
+        if val is None:
+            missing.append(field)
+    
+    if case.travellers.count() == 0:
+        missing.extend(['passport_numbers', 'traveller_names'])
+    
+    case.missing_fields = missing
+    
+    if missing:
+        case.route = 'missing'
+        return _finish(case, {
+            'route': 'missing',
+            'case_id': str(case.case_id),
+            'to': data.get('from', ''),
+            'missing': missing,
+            'original_subject': data.get('subject', ''),
+            'thread_id': data.get('thread_id', ''),
+            'preprocessing': preprocessing
+        }, status.HTTP_200_OK)
+    
+    for traveller in case.travellers.all():
+        if traveller.date_of_birth and case.start_date:
+            if isinstance(case.start_date, str):
+                start_date = datetime.strptime(case.start_date, '%Y-%m-%d').date()
+            else:
+                start_date = case.start_date
+            
+            if isinstance(traveller.date_of_birth, str):
+                dob = datetime.strptime(traveller.date_of_birth, '%Y-%m-%d').date()
+            else:
+                dob = traveller.date_of_birth
+            
+            age = (start_date - dob).days // 365
+            traveller.age_at_travel = age
+            traveller.is_senior = 76 <= age <= 86
+            traveller.save()
+    
+    engine = PricingEngine()
+    travellers_data = [
+        {'age_at_travel': t.age_at_travel} 
+        for t in case.travellers.all()
+    ]
+    
+    try:
+        pricing = engine.calculate_premium(
+            scope=case.scope,
+            plan=case.plan,
+            days=case.days,
+            travellers=travellers_data,
+            sports_flag=case.sports_coverage
+        )
+        
+        case.premium_base = pricing['base_per_traveller']
+        case.premium_subtotal = pricing['subtotal']
+        case.premium_group_discount = pricing['group_discount']
+        case.premium_net = pricing['net']
+        case.premium_tax = pricing['tax']
+        case.premium_fees = pricing['fees']
+        case.premium_total = pricing['total']
+        case.currency = pricing['currency']
+        case.route = 'success'
+        
+        return _finish(case, {
+            'route': 'success',
+            'case_id': str(case.case_id),
+            'extracted': extracted,
+            'pricing': {
+                'base_per_traveller': f"{pricing['base_per_traveller']:.2f}",
+                'subtotal': f"{pricing['subtotal']:.2f}",
+                'group_discount': f"{pricing['group_discount']:.2f}",
+                'net': f"{pricing['net']:.2f}",
+                'tax': f"{pricing['tax']:.2f}",
+                'fees': f"{pricing['fees']:.2f}",
+                'total': f"{pricing['total']:.2f}",
+                'currency': pricing['currency']
+            },
+            'travellers': [
+                {
+                    'name': t.full_name,
+                    'passport': t.passport_number,
+                    'age': t.age_at_travel,
+                    'is_senior': t.is_senior
+                }
+                for t in case.travellers.all()
+            ],
+            'preprocessing': preprocessing
+        }, status.HTTP_200_OK)
+    except Exception as e:
+        case.route = 'missing'
+        case.missing_fields = ['pricing_error']
+        return _finish(case, {
+            'route': 'missing',
+            'case_id': str(case.case_id),
+            'error': str(e)
+        }, status.HTTP_400_BAD_REQUEST)
+
+
+def _finish(case: Case, payload: dict, http_status: int) -> Tuple[dict, int]:
+    """Save the case together with the exact response so retries can replay it."""
+    case.response_json = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+    case.response_status = http_status
+    with transaction.atomic():
+        case.save()
+        if case.route not in stats.UNCOUNTED_ROUTES:
+            stats.record_case(case)
+    return payload, http_status
@@ -0,0 +1,87 @@
+import gzip
+import io
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+
+from apps.core.compression import decompress
+from apps.core.formats import MessagePackParser
+
+BODY = (
+    "Hello,\nPlease cover {count} travellers on outbound worldwide insurance, Gold plan, "
+    "from 2026-01-10 to 2026-01-24 (15 days).\nPassports attached.\n\nThank you"
+)
+# One OCR'd passport page: printed fields, then the two 44-character MRZ lines.
+OCR_PAGE = (
+    "PASSPORT  PASSEPORT\nType P  Code SWE  Passport No. {number}\nSurname ANDERSON\n"
+    "Given names TRAVELLER{index}\nNationality SWEDISH\nDate of birth 01 JAN 1980\n"
+    "{mrz1}\n{number}<SWE8001015M2512015<<<<<<<<<<<<<<06"
+)
+
+
+def build_payload(travellers: int) -> dict:
+    return {
+        'message_id': f"bench-{travellers}",
+        'thread_id': f"bench-{travellers}",
+        'from': 'broker@example.com',
+        'subject': 'Outbound Worldwide Gold',
+        'body': BODY.format(count=travellers),
+        'received_at': '2026-01-05T09:00:00Z',
+        'ocr_results': [
+            OCR_PAGE.format(
+                index=i, number=f"WX{i:07d}", mrz1=f"P<SWEANDERSON<<TRAVELLER{i}".ljust(44, '<')
+            )
+            for i in range(travellers)
+        ],
+    }
+
+
+def _encoders():
+    import msgpack
+    encoders = {
+        'json': (lambda p: json.dumps(p).encode(), None, JSONParser()),
+        'json+gzip': (lambda p: gzip.compress(json.dumps(p).encode()), 'gzip', JSONParser()),
+        'msgpack': (lambda p: msgpack.packb(p), None, MessagePackParser()),
+        'msgpack+gzip': (lambda p: gzip.compress(msgpack.packb(p)), 'gzip', MessagePackParser()),
+    }
+    try:
+        import zstandard
+    except ImportError:
+        return encoders
+    compressor = zstandard.ZstdCompressor(level=3)
+    encoders['json+zstd'] = (lambda p: compressor.compress(json.dumps(p).encode()), 'zstd', JSONParser())
+    encoders['msgpack+zstd'] = (lambda p: compressor.compress(msgpack.packb(p)), 'zstd', MessagePackParser())
+    return encoders
+
+
+class Command(BaseCommand):
+    help = 'Compare ingest payload size and parse time for JSON, MessagePack, gzip and zstd'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--travellers', type=int, nargs='*', default=[3, 40])
+
+    def handle(self, *args, **options):
+        limit = settings.REQUEST_MAX_DECOMPRESSED_BYTES
+        self.stdout.write(f"{'travellers':>10} {'format':<14} {'bytes':>9} {'vs json':>8} {'parse us':>9}")
+        for travellers in options['travellers']:
+            payload = build_payload(travellers)
+            baseline = None
+            for name, (encode, encoding, parser) in _encoders().items():
+                data = encode(payload)
+                baseline = baseline or len(data)
+
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    body = decompress(data, encoding, limit) if encoding else data
+                    parsed = parser.parse(io.BytesIO(body), parser_context={})
+                elapsed = (time.perf_counter() - started) / options['repeat']
+                assert parsed == payload
+
+                self.stdout.write(
+                    f"{travellers:>10} {name:<14} {len(data):>9} {len(data) / baseline:>7.0%} "
+                    f"{elapsed * 1e6:>9.1f}"
+                )
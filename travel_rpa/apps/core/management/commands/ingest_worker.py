@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUBDIRS = ('incoming', 'processing', 'done', 'failed')
+# A payload whose worker process dies this many times is moved to failed/.
+MAX_CRASHES = 3
+
+
+def instance_dir_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def recover_stale(spool: Path, stale_seconds: float) -> List[str]:
+    """Return files claimed by dead instances to ``incoming/``.
+
+    Each running instance claims into its own ``processing/<host>-<pid>/``
+    and touches it while it works. A directory is only recovered when its
+    owner is a dead process on this host or it has not been touched for
+    ``stale_seconds`` (owners on other hosts sharing the spool).
+    """
+    hostname = socket.gethostname()
+    now = time.time()
+    recovered = []
+    for claim_dir in spool.joinpath('processing').iterdir():
+        if claim_dir.is_file():
+            # Layout without per-instance directories.
+            stale = now - claim_dir.stat().st_mtime > stale_seconds
+            if stale and claim_dir.suffix == '.json':
+                os.replace(claim_dir, spool / 'incoming' / claim_dir.name)
+                recovered.append(claim_dir.name)
+            continue
+        host, _, pid = claim_dir.name.rpartition('-')
+        if host == hostname and pid.isdigit():
+            stale = not _pid_alive(int(pid))
+        else:
+            stale = now - claim_dir.stat().st_mtime > stale_seconds
+        if not stale:
+            continue
+        for path in claim_dir.glob('*.json'):
+            os.replace(path, spool / 'incoming' / path.name)
+            recovered.append(path.name)
+        shutil.rmtree(claim_dir, ignore_errors=True)
+    return recovered
+
+
+def _init_worker():
+    import django
+    django.setup()
+    # Never share the parent's database sockets across the fork.
+    connections.close_all()
+
+
+def _write_result(path: Path, result: dict) -> None:
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(result, cls=DjangoJSONEncoder))
+    os.replace(tmp, path)
+
+
+def process_thread(spool_dir: str, claim_dir: str, filenames: List[str]) -> List[dict]:
+    """Ingest the claimed files of one email thread, oldest first.
+
+    Each file ends up in ``done/`` or ``failed/`` next to a
+    ``<name>.result.json`` with the pipeline response or the error.
+    """
+    from apps.core.ingest import ingest
+
+    spool = Path(spool_dir)
+    claim = Path(claim_dir)
+    outcomes = []
+    for filename in filenames:
+        source = claim / filename
+        os.utime(claim)
+        try:
+            payload, http_status = ingest(json.loads(source.read_text()))
+            target, result = 'done', {'status': http_status, 'response': payload}
+        except Exception as exc:
+            logger.exception("Spool ingest failed for %s", filename)
+            target, result = 'failed', {'error': str(exc), 'traceback': traceback.format_exc()}
+        _write_result(spool / target / f"{Path(filename).stem}.result.json", result)
+        os.replace(source, spool / target / filename)
+        outcomes.append({'file': filename, 'outcome': target})
+    return outcomes
+
+
+def scan_incoming(spool: Path, claim_dir: Path, busy_threads) -> Dict[str, List[str]]:
+    """Claim ready files from ``incoming/`` into ``claim_dir``, grouped by ``thread_id``.
+
+    Files of a thread that is still being processed stay in ``incoming/``
+    so the next batch for that thread cannot overtake the current one.
+    Unreadable payloads are moved straight to ``failed/``.
+    """
+    pending = {}
+    for path in sorted(spool.joinpath('incoming').glob('*.json')):
+        try:
+            data = json.loads(path.read_text())
+            thread_id = data.get('thread_id') or data['message_id']
+        except (OSError, ValueError, KeyError, AttributeError) as exc:
+            _write_result(spool / 'failed' / f"{path.stem}.result.json", {'error': f"Invalid payload: {exc}"})
+            shutil.move(str(path), spool / 'failed' / path.name)
+            continue
+        if thread_id in busy_threads:
+            continue
+        pending.setdefault(thread_id, []).append((str(data.get('received_at', '')), path.name))
+
+    groups = {}
+    for thread_id, entries in pending.items():
+        claimed = []
+        for _, name in sorted(entries):
+            try:
+                # Atomic rename: only one worker instance can claim a file.
+                os.replace(spool / 'incoming' / name, claim_dir / name)
+            except FileNotFoundError:
+                continue
+            claimed.append(name)
+        if claimed:
+            groups[thread_id] = claimed
+    return groups
+
+
+class Command(BaseCommand):
+    help = 'Ingest email payloads dropped into a spool directory using a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--spool-dir', default=settings.INGEST_SPOOL_DIR)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes; 0 processes files in this process'
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--stale-seconds', type=float, default=300,
+            help='Recover claims of instances on other hosts not seen for this long'
+        )
+        parser.add_argument('--once', action='store_true', help='Drain the spool and exit')
+
+    def handle(self, *args, **options):
+        spool = Path(options['spool_dir'])
+        for name in SPOOL_SUBDIRS:
+            spool.joinpath(name).mkdir(parents=True, exist_ok=True)
+        # Only files of dead instances are retried; live ones keep theirs.
+        for name in recover_stale(spool, options['stale_seconds']):
+            self.stdout.write(f"recovered: {name}")
+        claim_dir = spool / 'processing' / instance_dir_name()
+        claim_dir.mkdir(exist_ok=True)
+
+        try:
+            if options['workers'] == 0:
+                self._run_inline(spool, claim_dir, options)
+            else:
+                self._run_pool(spool, claim_dir, options)
+        finally:
+            # Anything still claimed goes back for the next instance.
+            for path in claim_dir.glob('*.json'):
+                os.replace(path, spool / 'incoming' / path.name)
+            shutil.rmtree(claim_dir, ignore_errors=True)
+
+    def _run_inline(self, spool, claim_dir, options):
+        while True:
+            os.utime(claim_dir)
+            groups = scan_incoming(spool, claim_dir, set())
+            for filenames in groups.values():
+                self._report(process_thread(str(spool), str(claim_dir), filenames))
+            if options['once'] and not groups:
+                return
+            if not groups:
+                time.sleep(options['poll_interval'])
+
+    def _run_pool(self, spool, claim_dir, options):
+        crashes = {}
+        while not self._run_pool_until_broken(spool, claim_dir, options, crashes):
+            self.stderr.write('worker process died; restarting the pool')
+
+    def _run_pool_until_broken(self, spool, claim_dir, options, crashes) -> bool:
+        """Feed the pool until drained (``--once``); ``False`` if a worker died."""
+        connections.close_all()
+        in_flight = {}
+        broken = False
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            while True:
+                os.utime(claim_dir)
+                if not broken:
+                    for thread_id, filenames in scan_incoming(
+                        spool, claim_dir, {t for t, _ in in_flight.values()}
+                    ).items():
+                        try:
+                            future = pool.submit(process_thread, str(spool), str(claim_dir), filenames)
+                        except BrokenProcessPool:
+                            self._release(spool, claim_dir, filenames, crashes, crashed=False)
+                            broken = True
+                            continue
+                        in_flight[future] = (thread_id, filenames)
+
+                if not in_flight:
+                    if broken:
+                        return False
+                    if options['once']:
+                        return True
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    _, filenames = in_flight.pop(future)
+                    try:
+                        self._report(future.result())
+                    except BrokenProcessPool:
+                        logger.error("Worker process died while ingesting %s", filenames)
+                        self._release(spool, claim_dir, filenames, crashes, crashed=True)
+                        broken = True
+
+    def _release(self, spool, claim_dir, filenames, crashes, crashed):
+        """Return unfinished files of a lost group to ``incoming/``, or fail repeat offenders."""
+        for filename in filenames:
+            source = claim_dir / filename
+            if not source.exists():
+                continue
+            if crashed:
+                crashes[filename] = crashes.get(filename, 0) + 1
+            if crashes.get(filename, 0) >= MAX_CRASHES:
+                _write_result(spool / 'failed' / f"{Path(filename).stem}.result.json", {
+                    'error': f"Worker process died {crashes[filename]} times while ingesting this file"
+                })
+                os.replace(source, spool / 'failed' / filename)
+                self._report([{'file': filename, 'outcome': 'failed'}])
+            else:
+                os.replace(source, spool / 'incoming' / filename)
+
+    def _report(self, outcomes):
+        for outcome in outcomes:
+            self.stdout.write(f"{outcome['outcome']}: {outcome['file']}")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily_stats summary table from cases and report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report drift; exit non-zero if the table is out of date'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            expected, stored = stats.compute_from_cases(), stats.stored_buckets()
+        else:
+            expected, stored = stats.rebuild()
+
+        drift = []
+        for key in sorted(set(expected) | set(stored), key=str):
+            want = expected.get(key, (0, 0))
+            have = stored.get(key, (0, 0))
+            if want[0] != have[0] or want[1] != have[1]:
+                drift.append((key, have, want))
+
+        for (day, route, plan, scope), have, want in drift:
+            self.stdout.write(
+                f"{day} {route} {plan or '-'} {scope or '-'}: "
+                f"stored {have[0]} cases / {have[1]}, actual {want[0]} cases / {want[1]}"
+            )
+        self.stdout.write(f"{len(drift)} of {len(expected)} buckets drifted")
+
+        if options['check']:
+            if drift:
+                raise CommandError('daily_stats is out of date; run rebuild_stats to fix it')
+            return
+
+        self.stdout.write(f"Rebuilt daily_stats with {len(expected)} buckets")
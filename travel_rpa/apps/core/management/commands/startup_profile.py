@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+DEFAULT_MODULES = [
+    'rest_framework',
+    'yaml',
+    'apps.pricing.engine',
+    'apps.extraction.mrz_parser',
+    'apps.core.ingest',
+    'apps.core.views',
+    'apps.core.warmup',
+    'apps.issuance.simulator',
+    'playwright.sync_api',
+    'google.cloud.storage',
+    'psycopg2',
+]
+
+# Runs in a fresh interpreter so every module is measured cold. The baseline
+# is a configured Django process, i.e. what every gunicorn worker pays anyway.
+PROBE = '''
+import json, os, sys, time
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+
+import django
+django.setup()
+before_rss = rss_bytes()
+before = time.perf_counter()
+error = None
+try:
+    __import__(sys.argv[1])
+except Exception as exc:
+    error = f"{type(exc).__name__}: {exc}"
+print(json.dumps({
+    'module': sys.argv[1],
+    'import_ms': (time.perf_counter() - before) * 1000,
+    'rss_delta_bytes': rss_bytes() - before_rss,
+    'baseline_rss_bytes': before_rss,
+    'error': error,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Report cold import time and RSS growth per module on top of a configured Django process'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules', nargs='*',
+            help='Modules to profile (defaults to the heavy dependencies of the service)'
+        )
+        parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or DEFAULT_MODULES
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'config.settings.development'
+        ))
+
+        results = []
+        for module in modules:
+            proc = subprocess.run(
+                [sys.executable, '-c', PROBE, module],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                results.append({'module': module, 'error': proc.stderr.strip().splitlines()[-1]})
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'module':<32} {'import ms':>10} {'RSS +MB':>9}")
+        for result in results:
+            if result.get('error'):
+                self.stdout.write(f"{result['module']:<32} {'-':>10} {'-':>9}  ({result['error']})")
+                continue
+            self.stdout.write(
+                f"{result['module']:<32} {result['import_ms']:>10.1f} "
+                f"{result['rss_delta_bytes'] / 2 ** 20:>9.1f}"
+            )
+        baselines = [r['baseline_rss_bytes'] for r in results if 'baseline_rss_bytes' in r]
+        if baselines:
+            self.stdout.write(f"Django baseline RSS: {min(baselines) / 2 ** 20:.1f} MB")
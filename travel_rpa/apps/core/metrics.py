@@ -0,0 +1,22 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+_lock = threading.Lock()
+_counters = Counter()
+
+
+def increment(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot() -> Dict[str, int]:
+    """Current counter values for this process (each gunicorn worker has its own)."""
+    with _lock:
+        return dict(_counters)
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Case',
+            fields=[
+                ('case_id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('message_id', models.CharField(db_index=True, max_length=255, unique=True)),
+                ('thread_id', models.CharField(max_length=255)),
+                ('idempotency_key', models.CharField(db_index=True, max_length=64, unique=True)),
+                ('from_email', models.EmailField(max_length=254)),
+                ('subject', models.TextField()),
+                ('body', models.TextField()),
+                ('received_at', models.DateTimeField()),
+                ('direction', models.CharField(blank=True, max_length=20, null=True)),
+                ('scope', models.CharField(blank=True, max_length=50, null=True)),
+                ('plan', models.CharField(blank=True, max_length=50, null=True)),
+                ('coverage_limit', models.IntegerField(blank=True, null=True)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('days', models.IntegerField(blank=True, null=True)),
+                ('sports_coverage', models.BooleanField(default=False)),
+                ('premium_base', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_age_load', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_sports_load', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_subtotal', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_group_discount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_net', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_tax', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_fees', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('premium_total', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('currency', models.CharField(default='USD', max_length=3)),
+                ('route', models.CharField(max_length=20)),
+                ('missing_fields', models.JSONField(default=list)),
+                ('intent_ok', models.BooleanField(default=False)),
+                ('email_storage_url', models.URLField(blank=True, null=True)),
+                ('attachments_storage_urls', models.JSONField(default=list)),
+                ('policy_pdf_url', models.URLField(blank=True, null=True)),
+                ('audit_json_url', models.URLField(blank=True, null=True)),
+                ('kb_version', models.CharField(default='v1.0', max_length=50)),
+                ('trace_id', models.UUIDField(db_index=True, default=uuid.uuid4)),
+                ('latency_ms', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'cases',
+            },
+        ),
+        migrations.CreateModel(
+            name='Traveller',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(max_length=255)),
+                ('passport_number', models.CharField(max_length=50)),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('age_at_travel', models.IntegerField(blank=True, null=True)),
+                ('is_senior', models.BooleanField(default=False)),
+                ('mrz_data', models.JSONField(blank=True, null=True)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='travellers', to='core.case')),
+            ],
+            options={
+                'db_table': 'travellers',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['received_at'], name='cases_receive_1ecc74_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['route'], name='cases_route_2427f7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['trace_id'], name='cases_trace_i_ca1c24_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.CharField(max_length=255, unique=True)),
+                ('facts_key', models.CharField(max_length=64)),
+                ('simhash', models.CharField(max_length=16)),
+                ('band0', models.IntegerField()),
+                ('band1', models.IntegerField()),
+                ('band2', models.IntegerField()),
+                ('band3', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='core.case')),
+            ],
+            options={
+                'db_table': 'email_fingerprints',
+                'indexes': [models.Index(fields=['facts_key', 'band0'], name='email_finge_facts_k_e38441_idx'), models.Index(fields=['facts_key', 'band1'], name='email_finge_facts_k_ec77e5_idx'), models.Index(fields=['facts_key', 'band2'], name='email_finge_facts_k_57ce17_idx'), models.Index(fields=['facts_key', 'band3'], name='email_finge_facts_k_f5c6f4_idx')],
+            },
+        ),
+    ]
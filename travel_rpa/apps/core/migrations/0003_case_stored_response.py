@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_email_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='response_json',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='response_status',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
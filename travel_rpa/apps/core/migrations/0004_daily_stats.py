@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_case_stored_response'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('route', models.CharField(max_length=20)),
+                ('plan', models.CharField(blank=True, default='', max_length=50)),
+                ('scope', models.CharField(blank=True, default='', max_length=50)),
+                ('case_count', models.PositiveIntegerField(default=0)),
+                ('premium_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'db_table': 'daily_stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystats',
+            constraint=models.UniqueConstraint(fields=('day', 'route', 'plan', 'scope'), name='daily_stats_bucket'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MRZParseResult',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('result', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'mrz_parse_results',
+            },
+        ),
+        migrations.AddField(
+            model_name='traveller',
+            name='mrz_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='traveller',
+            index=models.Index(fields=['passport_number', '-id'], name='travellers_passpor_3a919b_idx'),
+        ),
+    ]
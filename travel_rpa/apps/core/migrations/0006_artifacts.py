@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_mrz_parse_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Artifact',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField()),
+                ('encoding', models.CharField(default='identity', max_length=10)),
+                ('stored_size', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'artifacts',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_artifacts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='traveller',
+            name='mrz_result',
+            field=models.ForeignObject(from_fields=('mrz_hash',), null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.mrzparseresult', to_fields=('content_hash',)),
+        ),
+    ]
@@ -36,6 +36,8 @@ class Case(models.Model):
     route = models.CharField(max_length=20)
     missing_fields = models.JSONField(default=list)
     intent_ok = models.BooleanField(default=False)
+    response_json = models.TextField(null=True, blank=True)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
     
     email_storage_url = models.URLField(null=True, blank=True)
     attachments_storage_urls = models.JSONField(default=list)
@@ -65,6 +67,89 @@ class Traveller(models.Model):
     age_at_travel = models.IntegerField(null=True, blank=True)
     is_senior = models.BooleanField(default=False)
     mrz_data = models.JSONField(null=True, blank=True)
+    mrz_hash = models.CharField(max_length=64, null=True, blank=True)
+    # Join on mrz_hash without a column or constraint of its own, so a list
+    # of travellers can load their parses with select_related/prefetch.
+    mrz_result = models.ForeignObject(
+        'MRZParseResult', on_delete=models.DO_NOTHING, from_fields=('mrz_hash',),
+        to_fields=('content_hash',), null=True, related_name='+'
+    )
     
     class Meta:
         db_table = 'travellers'
+        indexes = [
+            # Latest record for a passport is a single probe of this index.
+            models.Index(fields=['passport_number', '-id']),
+        ]
+    
+    @property
+    def mrz(self):
+        """Parsed MRZ; new rows reference the shared parse result instead of copying it.
+
+        Reads ``mrz_result``, so load travellers with
+        ``select_related('mrz_result')`` to avoid a query per traveller.
+        """
+        if self.mrz_data is not None or self.mrz_hash is None:
+            return self.mrz_data
+        try:
+            return self.mrz_result.result
+        except MRZParseResult.DoesNotExist:
+            return None
+
+
+class MRZParseResult(models.Model):
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'mrz_parse_results'
+
+
+class EmailFingerprint(models.Model):
+    case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='fingerprints')
+    message_id = models.CharField(max_length=255, unique=True)
+    facts_key = models.CharField(max_length=64)
+    simhash = models.CharField(max_length=16)
+    band0 = models.IntegerField()
+    band1 = models.IntegerField()
+    band2 = models.IntegerField()
+    band3 = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'email_fingerprints'
+        indexes = [
+            models.Index(fields=['facts_key', 'band0']),
+            models.Index(fields=['facts_key', 'band1']),
+            models.Index(fields=['facts_key', 'band2']),
+            models.Index(fields=['facts_key', 'band3']),
+        ]
+
+
+class DailyStats(models.Model):
+    day = models.DateField()
+    route = models.CharField(max_length=20)
+    plan = models.CharField(max_length=50, blank=True, default='')
+    scope = models.CharField(max_length=50, blank=True, default='')
+    case_count = models.PositiveIntegerField(default=0)
+    premium_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        db_table = 'daily_stats'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'route', 'plan', 'scope'], name='daily_stats_bucket'),
+        ]
+
+
+class Artifact(models.Model):
+    """Metadata for a stored file; the blob lives in the artifact backend under its hash."""
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    encoding = models.CharField(max_length=10, default='identity')
+    stored_size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'artifacts'
@@ -0,0 +1,58 @@
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from apps.extraction.mrz_cache import MRZParseCache
+from .models import MRZParseResult, Traveller
+
+
+class DatabaseMRZStore:
+    """Persistent layer of the MRZ parse cache, shared by every worker."""
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        return (
+            MRZParseResult.objects.filter(content_hash=content_hash)
+            .values_list('result', flat=True).first()
+        )
+
+    def put(self, content_hash: str, parsed: Dict) -> None:
+        MRZParseResult.objects.get_or_create(content_hash=content_hash, defaults={'result': parsed})
+
+
+_cache = None
+
+
+def get_mrz_cache() -> MRZParseCache:
+    global _cache
+    if _cache is None:
+        _cache = MRZParseCache(maxsize=settings.MRZ_CACHE_SIZE, store=DatabaseMRZStore())
+    return _cache
+
+
+def parse_passport(ocr_text: str) -> Tuple[str, Optional[Dict]]:
+    """Parse (or recall) one OCR result; the returned dict is shared and must not be mutated."""
+    return get_mrz_cache().parse(ocr_text)
+
+
+def latest_traveller(passport_number: str) -> Optional[Dict]:
+    """Most recent traveller record for a passport number, or ``None``."""
+    return (
+        Traveller.objects.filter(passport_number=passport_number.strip().upper())
+        .order_by('-id')
+        .values('full_name', 'passport_number', 'date_of_birth', 'case_id')
+        .first()
+    )
+
+
+def fill_from_previous(parsed: Dict) -> Dict:
+    """Complete a parse with an unreadable name or birth date from the passport's last record."""
+    if parsed['full_name'] and parsed['date_of_birth']:
+        return parsed
+    previous = latest_traveller(parsed['passport_number']) if parsed['passport_number'] else None
+    if previous is None:
+        return parsed
+    filled = dict(parsed)
+    filled['full_name'] = parsed['full_name'] or previous['full_name']
+    if not parsed['date_of_birth'] and previous['date_of_birth']:
+        filled['date_of_birth'] = previous['date_of_birth'].isoformat()
+    return filled
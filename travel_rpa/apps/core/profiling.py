@@ -0,0 +1,211 @@
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+# (requests left, capture SQL, capture allocations). Replaced as a whole so
+# the disabled check in the middleware is one tuple read, and so the signal
+# handler never needs a lock.
+_armed = (0, False, False)
+_slot_lock = threading.Lock()
+# cProfile/tracemalloc style hooks are process-wide: one capture at a time.
+_capture_lock = threading.Lock()
+
+
+def arm(requests: int, sql: bool = False, memory: bool = False) -> None:
+    """Profile the next ``requests`` matching requests handled by this process."""
+    global _armed
+    _armed = (max(int(requests), 0), bool(sql), bool(memory))
+
+
+def disarm() -> None:
+    arm(0)
+
+
+def status() -> Dict:
+    remaining, sql, memory = _armed
+    return {
+        'remaining': remaining,
+        'sql': sql,
+        'memory': memory,
+        'output_dir': settings.PROFILE_OUTPUT_DIR,
+        'pid': os.getpid()
+    }
+
+
+def _take_slot():
+    global _armed
+    with _slot_lock:
+        remaining, sql, memory = _armed
+        if remaining <= 0:
+            return None
+        _armed = (remaining - 1, sql, memory)
+        return sql, memory
+
+
+class StackSampler(threading.Thread):
+    """Sample one thread's Python stack at a fixed interval.
+
+    Counts are keyed by ``root;...;leaf`` so ``write_folded`` produces the
+    collapsed-stack format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, target_ident: int, interval: float):
+        super().__init__(daemon=True, name='stack-sampler')
+        self.target_ident = target_ident
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def write_folded(self, path: str) -> None:
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class QueryCapture:
+    """``connection.execute_wrapper`` hook recording each statement and its duration."""
+
+    def __init__(self):
+        self.queries: List[Dict] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'many': many,
+                'ms': round((time.perf_counter() - start) * 1000, 3)
+            })
+
+
+@contextmanager
+def maybe_profile(label: str):
+    """Profile the enclosed block if a capture is armed, otherwise do nothing.
+
+    Yields the base path of the written files, or ``None`` when the block
+    was not profiled (not armed, or another capture is running).
+    """
+    if not _armed[0] or not _capture_lock.acquire(blocking=False):
+        yield None
+        return
+    try:
+        options = _take_slot()
+        if options is None:
+            yield None
+            return
+        sql, memory = options
+        os.makedirs(settings.PROFILE_OUTPUT_DIR, exist_ok=True)
+        base = os.path.join(
+            settings.PROFILE_OUTPUT_DIR,
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{threading.get_ident()}-{label}"
+        )
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        capture = QueryCapture() if sql else None
+        started_tracemalloc = memory and not tracemalloc.is_tracing()
+        with ExitStack() as stack:
+            if capture is not None:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(capture))
+            if started_tracemalloc:
+                tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+            sampler.start()
+            start = time.perf_counter()
+            try:
+                yield base
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                sampler.stop()
+                snapshot = tracemalloc.take_snapshot() if memory else None
+                if started_tracemalloc:
+                    tracemalloc.stop()
+
+        sampler.write_folded(f"{base}.folded")
+        summary = {
+            'label': label,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'samples': sum(sampler.samples.values()),
+            'sample_interval_ms': settings.PROFILE_SAMPLE_INTERVAL_MS,
+            'folded': f"{base}.folded"
+        }
+        if snapshot is not None:
+            snapshot.dump(f"{base}.tracemalloc")
+            summary['tracemalloc'] = f"{base}.tracemalloc"
+            summary['top_allocations'] = [
+                str(stat) for stat in snapshot.statistics('lineno')[:20]
+            ]
+        if capture is not None:
+            summary['query_count'] = len(capture.queries)
+            summary['query_ms'] = round(sum(q['ms'] for q in capture.queries), 3)
+            summary['queries'] = capture.queries
+        with open(f"{base}.json", 'w') as f:
+            json.dump(summary, f, indent=2)
+        metrics.increment('profiling.captures')
+    finally:
+        _capture_lock.release()
+
+
+def _label_for(path: str) -> Optional[str]:
+    for prefix in settings.PROFILE_PATHS:
+        if path.startswith(prefix):
+            return prefix.strip('/').replace('/', '-')
+    return None
+
+
+class ProfilingMiddleware:
+    """Profile armed ingest/issuance requests; a single tuple read when disarmed."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _armed[0]:
+            return self.get_response(request)
+        label = _label_for(request.path)
+        if label is None:
+            return self.get_response(request)
+        with maybe_profile(label) as base:
+            response = self.get_response(request)
+        if base is not None:
+            response['X-Profile'] = os.path.basename(base)
+        return response
+
+
+def _handle_signal(signum, frame):
+    arm(settings.PROFILE_SIGNAL_REQUESTS, sql=True, memory=True)
+
+
+def install_signal_handler(signum: int = signal.SIGUSR2) -> None:
+    """``kill -USR2 <worker pid>`` profiles that worker's next requests."""
+    signal.signal(signum, _handle_signal)
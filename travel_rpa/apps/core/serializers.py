@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from .models import Case, Traveller
+
+
+class TravellerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Traveller
+        fields = [
+            'full_name', 'passport_number', 'date_of_birth', 'age_at_travel', 'is_senior', 'mrz'
+        ]
+        read_only_fields = ['mrz']
+
+
+class CaseSerializer(serializers.ModelSerializer):
+    travellers = TravellerSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Case
+        fields = [
+            'case_id', 'message_id', 'thread_id', 'from_email', 'subject', 'received_at',
+            'route', 'missing_fields', 'direction', 'scope', 'plan', 'days',
+            'start_date', 'end_date', 'sports_coverage', 'premium_total', 'currency',
+            'policy_pdf_url', 'audit_json_url', 'travellers', 'created_at', 'updated_at'
+        ]
@@ -0,0 +1,122 @@
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Case, DailyStats
+
+# Claimed cases that are still being processed are not counted, nor are the
+# rows that only hold a near-duplicate delivery's reply (the case it matched is).
+UNCOUNTED_ROUTES = ['processing', 'duplicate']
+
+Bucket = Tuple[object, str, str, str]
+
+
+def _received_day(received_at):
+    if isinstance(received_at, str):
+        received_at = parse_datetime(received_at)
+    if received_at is None:
+        received_at = timezone.now()
+    if timezone.is_naive(received_at):
+        received_at = timezone.make_aware(received_at, dt_timezone.utc)
+    return timezone.localdate(received_at)
+
+
+def record_case(case: Case) -> None:
+    """Add a finished case to its day x route x plan x scope bucket.
+
+    Only call this inside ``ingest._finish``'s atomic block, after the case
+    is saved: ``rebuild`` relies on the case and its increment committing
+    together. The increment is a single ``UPDATE ... SET case_count =
+    case_count + 1`` so concurrent ingests never lose counts.
+    """
+    bucket, _ = DailyStats.objects.get_or_create(
+        day=_received_day(case.received_at),
+        route=case.route,
+        plan=case.plan or '',
+        scope=case.scope or '',
+    )
+    DailyStats.objects.filter(pk=bucket.pk).update(
+        case_count=F('case_count') + 1,
+        premium_total=F('premium_total') + (case.premium_total or Decimal('0')),
+    )
+
+
+def compute_from_cases() -> Dict[Bucket, Tuple[int, Decimal]]:
+    """Recompute every bucket from the cases table (full scan)."""
+    rows = (
+        Case.objects.exclude(route__in=UNCOUNTED_ROUTES)
+        .annotate(day=TruncDate('received_at'))
+        .values('day', 'route', 'plan', 'scope')
+        .annotate(case_count=Count('case_id'), premium=Sum('premium_total'))
+    )
+    buckets = {}
+    for row in rows:
+        key = (row['day'], row['route'], row['plan'] or '', row['scope'] or '')
+        count, premium = buckets.get(key, (0, Decimal('0')))
+        buckets[key] = (count + row['case_count'], premium + (row['premium'] or Decimal('0')))
+    return buckets
+
+
+def stored_buckets() -> Dict[Bucket, Tuple[int, Decimal]]:
+    return {
+        (row.day, row.route, row.plan, row.scope): (row.case_count, row.premium_total)
+        for row in DailyStats.objects.all()
+    }
+
+
+def _lock_table() -> None:
+    """Hold off every other write to daily_stats until the transaction ends.
+
+    ``record_case`` writes its bucket only after ``_finish`` has saved the
+    case, so once this returns every ingest that touched the table has
+    committed, and any other blocks before its case becomes visible.
+    """
+    table = connection.ops.quote_name(DailyStats._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Conflicts with the ROW EXCLUSIVE lock INSERT/UPDATE take, not with reads.
+            cursor.execute(f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE')
+        else:
+            # SQLite takes its database-wide write lock on the first write.
+            cursor.execute(f'UPDATE {table} SET case_count = case_count WHERE 1 = 0')
+
+
+def rebuild() -> Tuple[Dict[Bucket, Tuple[int, Decimal]], Dict[Bucket, Tuple[int, Decimal]]]:
+    """Overwrite every bucket with the count from the cases table.
+
+    Runs in one transaction that locks the table before scanning the cases,
+    so it is serialized against ``record_case``: an ingest that finished
+    first is in the scan, and one that finishes later adds its increment on
+    top of the rebuilt row. Rows are updated in place, with stale buckets
+    zeroed rather than deleted, because ``record_case`` may already have
+    read a bucket's primary key and only be waiting to update it. Returns the
+    recomputed buckets and the ones stored before.
+    """
+    with transaction.atomic():
+        _lock_table()
+        rows = {
+            (row.day, row.route, row.plan, row.scope): row
+            for row in DailyStats.objects.all()
+        }
+        stored = {key: (row.case_count, row.premium_total) for key, row in rows.items()}
+        expected = compute_from_cases()
+
+        changed = []
+        for key, row in rows.items():
+            row.case_count, row.premium_total = expected.get(key, (0, Decimal('0')))
+            if (row.case_count, row.premium_total) != stored[key]:
+                changed.append(row)
+        DailyStats.objects.bulk_update(changed, ['case_count', 'premium_total'])
+        DailyStats.objects.bulk_create([
+            DailyStats(day=day, route=route, plan=plan, scope=scope,
+                       case_count=count, premium_total=premium)
+            for (day, route, plan, scope), (count, premium) in expected.items()
+            if (day, route, plan, scope) not in rows
+        ])
+    return expected, stored
@@ -4,4 +4,10 @@ from . import views
 urlpatterns = [
     path('ingest', views.ingest_email, name='ingest_email'),
     path('simulate-issuance', views.simulate_issuance, name='simulate_issuance'),
+    path('cases/<uuid:case_id>', views.case_detail, name='case_detail'),
+    path('travellers/<str:passport_number>', views.traveller_lookup, name='traveller_lookup'),
+    path('profiling', views.profiling_control, name='profiling_control'),
+    path('artifacts/<str:content_hash>', views.artifact_download, name='artifact_download'),
+    path('metrics', views.metrics, name='metrics'),
+    path('stats', views.stats, name='stats'),
 ]
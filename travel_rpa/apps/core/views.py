@@ -2,14 +2,24 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
-from .models import Case, Traveller
-from apps.extraction.mrz_parser import MRZParser
-from apps.pricing.engine import PricingEngine
-from apps.issuance.simulator import PlaywrightSimulator
-import hashlib
-from datetime import datetime, date
-import pytz
-import re
+from .models import Artifact, Case, DailyStats, Traveller
+from .artifacts import open_artifact, store_issuance_artifacts
+from .ingest import ingest
+from .passports import latest_traveller
+from .serializers import CaseSerializer
+from .db_router import read_only_view
+from . import metrics as service_metrics
+from . import admission, profiling
+import hmac
+from datetime import timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date, parse_http_date_safe
+from django.db.models import Prefetch
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+from apps.issuance.drivers import IssuanceError, IssuanceNotConfigured, IssuanceUnavailable, get_driver
 
 
 def verify_webhook_secret(request):
@@ -24,294 +34,306 @@ def ingest_email(request):
     if not verify_webhook_secret(request):
         return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
     
-    data = request.data
-    
-    idem_string = f"{data['message_id']}|{data.get('body', '')}"
-    idempotency_key = hashlib.sha256(idem_string.encode()).hexdigest()
-    
-    if Case.objects.filter(idempotency_key=idempotency_key).exists():
-        existing_case = Case.objects.get(idempotency_key=idempotency_key)
-        return Response({
-            'status': 'duplicate',
-            'case_id': str(existing_case.case_id),
-            'idempotency_key': idempotency_key
-        })
-    
-    extracted = extract_policy_data(data.get('body', ''), data.get('subject', ''))
-    
-    if not extracted['intent_ok']:
-        return Response({
-            'route': 'ignore',
-            'intent_ok': False
-        })
-    
-    case = Case.objects.create(
-        message_id=data['message_id'],
-        thread_id=data.get('thread_id', data['message_id']),
-        idempotency_key=idempotency_key,
-        from_email=data.get('from', ''),
-        subject=data.get('subject', ''),
-        body=data.get('body', ''),
-        received_at=data.get('received_at', datetime.now(pytz.UTC)),
-        direction=extracted.get('direction'),
-        scope=extracted.get('scope'),
-        plan=extracted.get('plan'),
-        coverage_limit=extracted.get('coverage_limit'),
-        start_date=extracted.get('start_date'),
-        end_date=extracted.get('end_date'),
-        days=extracted.get('days'),
-        sports_coverage=extracted.get('sports_coverage', False),
-        intent_ok=True
-    )
-    
-    ocr_results = data.get('ocr_results', [])
-    mrz_parser = MRZParser()
-    for ocr_text in ocr_results:
-        parsed = mrz_parser.parse_passport(ocr_text)
-        if parsed:
-            Traveller.objects.create(
-                case=case,
-                full_name=parsed['full_name'],
-                passport_number=parsed['passport_number'],
-                date_of_birth=parsed['date_of_birth'],
-                mrz_data=parsed
-            )
-    
-    if extracted.get('direction') == 'INBOUND':
-        required = ['direction', 'plan', 'days', 'start_date']
-    else:
-        required = ['direction', 'scope', 'plan', 'days', 'start_date']
-    
-    missing = []
-    for field in required:
-        val = extracted.get(field)
-        if val is None:
-            missing.append(field)
-    
-    if case.travellers.count() == 0:
-        missing.extend(['passport_numbers', 'traveller_names'])
+    payload, http_status = ingest(request.data)
+    response = Response(payload, status=http_status)
+    if payload.get('status') == 'processing':
+        response['Retry-After'] = '5'
+    return response
+
+
+@api_view(['POST'])
+def simulate_issuance(request):
+    if not verify_webhook_secret(request):
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
     
-    case.missing_fields = missing
+    case = get_object_or_404(Case, case_id=request.data.get('case_id'))
     
-    if missing:
-        case.route = 'missing'
-        case.save()
-        return Response({
-            'route': 'missing',
+    try:
+        # Chromium is only launched when the caller asks for a screenshot.
+        driver = get_driver(screenshot=bool(request.data.get('screenshot', False)))
+        result = driver.simulate_issuance({
             'case_id': str(case.case_id),
-            'to': data.get('from', ''),
-            'missing': missing,
-            'original_subject': data.get('subject', ''),
-            'thread_id': data.get('thread_id', '')
+            'plan': case.plan,
+            'scope': case.scope,
+            'days': case.days
         })
+    except IssuanceNotConfigured as exc:
+        return Response(
+            {'error': f"Issuance is not configured: {exc}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    except IssuanceUnavailable as exc:
+        response = Response(
+            {'error': f"Issuance portal unavailable: {exc}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        response['Retry-After'] = '30'
+        return response
+    except IssuanceError as exc:
+        return Response({'error': f"Issuance failed: {exc}"}, status=status.HTTP_502_BAD_GATEWAY)
     
-    for traveller in case.travellers.all():
-        if traveller.date_of_birth and case.start_date:
-            if isinstance(case.start_date, str):
-                start_date = datetime.strptime(case.start_date, '%Y-%m-%d').date()
-            else:
-                start_date = case.start_date
-            
-            if isinstance(traveller.date_of_birth, str):
-                dob = datetime.strptime(traveller.date_of_birth, '%Y-%m-%d').date()
-            else:
-                dob = traveller.date_of_birth
-            
-            age = (start_date - dob).days // 365
-            traveller.age_at_travel = age
-            traveller.is_senior = 76 <= age <= 86
-            traveller.save()
-    
-    engine = PricingEngine()
-    travellers_data = [
-        {'age_at_travel': t.age_at_travel} 
-        for t in case.travellers.all()
-    ]
+    urls = store_issuance_artifacts(case, result)
     
-    try:
-        pricing = engine.calculate_premium(
-            scope=case.scope,
-            plan=case.plan,
-            days=case.days,
-            travellers=travellers_data,
-            sports_flag=case.sports_coverage
-        )
-        
-        case.premium_base = pricing['base_per_traveller']
-        case.premium_subtotal = pricing['subtotal']
-        case.premium_group_discount = pricing['group_discount']
-        case.premium_net = pricing['net']
-        case.premium_tax = pricing['tax']
-        case.premium_fees = pricing['fees']
-        case.premium_total = pricing['total']
-        case.currency = pricing['currency']
-        case.route = 'success'
-        case.save()
-        
-        return Response({
-            'route': 'success',
-            'case_id': str(case.case_id),
-            'extracted': extracted,
-            'pricing': {
-                'base_per_traveller': f"{pricing['base_per_traveller']:.2f}",
-                'subtotal': f"{pricing['subtotal']:.2f}",
-                'group_discount': f"{pricing['group_discount']:.2f}",
-                'net': f"{pricing['net']:.2f}",
-                'tax': f"{pricing['tax']:.2f}",
-                'fees': f"{pricing['fees']:.2f}",
-                'total': f"{pricing['total']:.2f}",
-                'currency': pricing['currency']
-            },
-            'travellers': [
-                {
-                    'name': t.full_name,
-                    'passport': t.passport_number,
-                    'age': t.age_at_travel,
-                    'is_senior': t.is_senior
-                }
-                for t in case.travellers.all()
-            ]
-        })
-    except Exception as e:
-        case.route = 'missing'
-        case.missing_fields = ['pricing_error']
-        case.save()
-        return Response({
-            'route': 'missing',
-            'case_id': str(case.case_id),
-            'error': str(e)
-        }, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'screenshot_url': urls['screenshot_url'],
+        'policy_pdf_url': urls['policy_pdf_url'],
+        'audit_json_url': urls['audit_json_url'],
+        'policy_number': result['simulated_policy_number'],
+        'simulation_timestamp': result['timestamp']
+    })
 
 
-@api_view(['POST'])
-def simulate_issuance(request):
+@api_view(['GET'])
+@read_only_view
+def case_detail(request, case_id):
     if not verify_webhook_secret(request):
         return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
     
-    case_id = request.data.get('case_id')
-    case = Case.objects.get(case_id=case_id)
-    
-    simulator = PlaywrightSimulator()
-    result = simulator.simulate_issuance({
-        'case_id': str(case.case_id),
-        'plan': case.plan,
-        'scope': case.scope,
-        'days': case.days
-    })
+    travellers = Prefetch('travellers', queryset=Traveller.objects.select_related('mrz_result'))
+    case = Case.objects.prefetch_related(travellers).filter(case_id=case_id).first()
+    if case is None:
+        return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(CaseSerializer(case).data)
+
+
+@api_view(['GET'])
+@read_only_view
+def traveller_lookup(request, passport_number):
+    if not verify_webhook_secret(request):
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
     
+    traveller = latest_traveller(passport_number)
+    if traveller is None:
+        return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
     return Response({
-        'screenshot_url': result['screenshot_path'],
-        'policy_number': result['simulated_policy_number'],
-        'simulation_timestamp': result['timestamp']
+        'passport_number': traveller['passport_number'],
+        'full_name': traveller['full_name'],
+        'date_of_birth': traveller['date_of_birth'],
+        'last_case_id': str(traveller['case_id'])
     })
 
 
-def extract_policy_data(body: str, subject: str) -> dict:
-    intent_patterns = [
-        r'travel\s+insurance',
-        r'\binsurance\b',
-        r'\bpolic(y|ies)\b',
-        r'\bcover(age)?\b',
-        r'\bissue',
-        r'\barrange',
-        r'\bprovide',
-        r'\binsure',
-        r'\bquote'
-    ]
-    intent_ok = any(re.search(pattern, body.lower()) for pattern in intent_patterns)
+def verify_profiling_secret(request):
+    secret = request.headers.get('X-Profiling-Secret') or ''
+    return hmac.compare_digest(secret, settings.PROFILING_ADMIN_SECRET)
+
+
+@api_view(['GET', 'POST', 'DELETE'])
+def profiling_control(request):
+    """Arm, inspect or disarm profiling in the worker that serves this request.
+
+    Arming is per worker process: the response's ``pid`` says which one. It
+    needs the separate ``PROFILING_ADMIN_SECRET`` rather than the n8n webhook
+    secret and is disabled while that setting is empty.
+    """
+    if not settings.PROFILING_ADMIN_SECRET:
+        return Response({'error': 'Profiling control is disabled'}, status=status.HTTP_403_FORBIDDEN)
+    if not verify_profiling_secret(request):
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    if request.method == 'POST':
+        try:
+            count = int(request.data.get('requests', 1))
+        except (TypeError, ValueError):
+            return Response({'error': 'requests must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        profiling.arm(count, sql=bool(request.data.get('sql')), memory=bool(request.data.get('memory')))
+    elif request.method == 'DELETE':
+        profiling.disarm()
+    return Response(profiling.status())
+
+
+ARTIFACT_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_range(header, size):
+    """Parse a single ``bytes=`` range into inclusive ``(start, end)``.
+
+    Returns ``None`` for headers to ignore (malformed or multi-range, which
+    are answered with the full body) and ``False`` when unsatisfiable.
+    """
+    if not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                return False
+            return max(size - suffix, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return False
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _accepts_gzip(header):
+    """Whether an ``Accept-Encoding`` header allows gzip, honouring q-values.
+
+    An explicit ``gzip`` (or ``x-gzip``) entry decides; otherwise ``*``
+    does. ``q=0`` means "not acceptable".
+    """
+    weights = {}
+    for entry in header.split(','):
+        coding, *params = [part.strip() for part in entry.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            weights[coding.lower()] = q
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in weights:
+            return weights[coding] > 0
+    return False
+
+
+def _stream_chunks(stream, length):
+    try:
+        while length > 0:
+            chunk = stream.read(min(ARTIFACT_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        stream.close()
+
+
+@require_http_methods(['GET', 'HEAD'])
+@read_only_view
+def artifact_download(request, content_hash):
+    if not verify_webhook_secret(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
     
-    direction = None
-    scope = None
-    if re.search(r'\binbound\b', body.lower()):
-        direction = 'INBOUND'
-        scope = 'INBOUND'
-    elif re.search(r'\boutbound\b', body.lower()):
-        direction = 'OUTBOUND'
+    artifact = Artifact.objects.filter(content_hash=content_hash).first()
+    if artifact is None:
+        return JsonResponse({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if scope != 'INBOUND':
-        if re.search(r'(worldwide\s+excluding|world\s+except|excl\.?\s*(us|usa|canada)|excluding\s*(us|usa|canada)|excluding\s+country\s+of\s+residence)', body.lower()):
-            scope = 'WW_EXCL_US_CA'
-        elif re.search(r'worldwide', body.lower()):
-            scope = 'WORLDWIDE'
+    # Gzipped blobs go out as stored when the client accepts it and wants the
+    # whole body; ranges always refer to the decoded bytes.
+    passthrough = (
+        artifact.encoding == 'gzip' and 'HTTP_RANGE' not in request.META
+        and _accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    )
+    etag = f'"{artifact.content_hash}-gzip"' if passthrough else f'"{artifact.content_hash}"'
+    modified = int(artifact.created_at.timestamp())
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(modified),
+        'Cache-Control': 'private, max-age=31536000, immutable',
+        'Accept-Ranges': 'bytes',
+        'Vary': 'Accept-Encoding',
+    }
     
-    if scope is None and re.search(r'(europe|greece)', body.lower()):
-        scope = 'WW_EXCL_US_CA'
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        not_modified = '*' in tags or bool(
+            tags & {f'"{artifact.content_hash}"', f'"{artifact.content_hash}-gzip"'}
+        )
+    else:
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        not_modified = since is not None and modified <= since
+    if not_modified:
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    plan = None
-    if re.search(r'\bplatinum\b', body.lower()):
-        plan = 'Platinum'
-    elif re.search(r'gold\s+plus', body.lower()):
-        plan = 'Gold Plus'
-    elif re.search(r'\bgold\b', body.lower()):
-        plan = 'Gold'
-    elif re.search(r'\bsilver\b', body.lower()):
-        plan = 'Silver'
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if 'HTTP_RANGE' in request.META and (
+        if_range is None or if_range == etag or parse_http_date_safe(if_range) == modified
+    ):
+        byte_range = _parse_range(request.META['HTTP_RANGE'], artifact.size)
+    if byte_range is False:
+        headers['Content-Range'] = f"bytes */{artifact.size}"
+        return HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
     
-    coverage_match = re.search(r'\$?\s?(\d+),?(\d{3})', body)
-    if coverage_match and not plan:
-        coverage_str = coverage_match.group(1) + coverage_match.group(2)
-        coverage = int(coverage_str)
-        if coverage == 50000 or coverage == 50:
-            plan = 'Silver'
-        elif coverage == 100000 or coverage == 100:
-            plan = 'Gold'
-        elif coverage == 300000 or coverage == 300:
-            plan = 'Gold Plus'
-        elif coverage == 500000 or coverage == 500:
-            plan = 'Platinum'
+    http_status = status.HTTP_200_OK
+    length = artifact.stored_size if passthrough else artifact.size
+    if passthrough:
+        headers['Content-Encoding'] = 'gzip'
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        http_status = status.HTTP_206_PARTIAL_CONTENT
+        headers['Content-Range'] = f"bytes {start}-{end}/{artifact.size}"
+    headers['Content-Length'] = str(length)
     
-    days = None
-    days_match = re.search(r'(\d+)\s+days?', body.lower())
-    if days_match:
-        days = int(days_match.group(1))
+    if request.method == 'HEAD':
+        return HttpResponse(status=http_status, content_type=artifact.content_type, headers=headers)
     
-    if not days:
-        duration_patterns = [
-            (r'(\d+)\s+weeks?', 7),
-            (r'(\d+)\s+months?', 30),
-        ]
-        for pattern, multiplier in duration_patterns:
-            match = re.search(pattern, body.lower())
-            if match:
-                days = int(match.group(1)) * multiplier
-                break
+    stream = open_artifact(artifact, decode=not passthrough)
+    if byte_range:
+        stream.seek(byte_range[0])
+    return StreamingHttpResponse(
+        _stream_chunks(stream, length), status=http_status,
+        content_type=artifact.content_type, headers=headers
+    )
+
+
+@api_view(['GET'])
+def metrics(request):
+    if not verify_webhook_secret(request):
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
     
-    start_date = None
-    end_date = None
-    date_matches = re.findall(r'(\d{4})-(\d{2})-(\d{2})', body)
-    if len(date_matches) >= 2:
-        start_date = f"{date_matches[0][0]}-{date_matches[0][1]}-{date_matches[0][2]}"
-        end_date = f"{date_matches[1][0]}-{date_matches[1][1]}-{date_matches[1][2]}"
+    return Response({**service_metrics.snapshot(), **admission.gauges()})
+
+
+@api_view(['GET'])
+@read_only_view
+def stats(request):
+    if not verify_webhook_secret(request):
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
     
-    if not start_date:
-        date_patterns = [
-            (r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', 'dmy'),
-            (r'(\d{4})[/-](\d{1,2})[/-](\d{1,2})', 'ymd'),
-        ]
-        for pattern, format_type in date_patterns:
-            matches = re.findall(pattern, body)
-            if len(matches) >= 2:
-                try:
-                    if format_type == 'dmy':
-                        start_date = f"{matches[0][2]}-{matches[0][1].zfill(2)}-{matches[0][0].zfill(2)}"
-                        end_date = f"{matches[1][2]}-{matches[1][1].zfill(2)}-{matches[1][0].zfill(2)}"
-                    elif format_type == 'ymd':
-                        start_date = f"{matches[0][0]}-{matches[0][1].zfill(2)}-{matches[0][2].zfill(2)}"
-                        end_date = f"{matches[1][0]}-{matches[1][1].zfill(2)}-{matches[1][2].zfill(2)}"
-                    break
-                except (IndexError, ValueError):
-                    continue
+    dates = {}
+    for field in ('from', 'to'):
+        value = request.query_params.get(field)
+        if value is None:
+            continue
+        try:
+            dates[field] = parse_date(value)
+        except ValueError:
+            dates[field] = None
+        if dates[field] is None:
+            return Response(
+                {'error': f"'{field}' must be a valid YYYY-MM-DD date"}, status=status.HTTP_400_BAD_REQUEST
+            )
+    date_to = dates.get('to') or timezone.localdate()
+    date_from = dates.get('from') or date_to - timedelta(days=30)
+    if date_from > date_to:
+        return Response({'error': "'from' must not be after 'to'"}, status=status.HTTP_400_BAD_REQUEST)
     
-    sports_coverage = bool(re.search(r'(sports?\s+coverage|sports?\s+activit|motorcycle)', body.lower()))
+    # rebuild_stats zeroes stale buckets instead of deleting them.
+    rows = DailyStats.objects.filter(day__range=(date_from, date_to), case_count__gt=0).order_by('day', 'route', 'plan', 'scope')
+    for field in ('route', 'plan', 'scope'):
+        if field in request.query_params:
+            rows = rows.filter(**{field: request.query_params[field]})
+    rows = list(rows)
     
-    return {
-        'intent_ok': intent_ok,
-        'direction': direction,
-        'scope': scope,
-        'plan': plan,
-        'coverage_limit': None,
-        'days': days,
-        'start_date': start_date,
-        'end_date': end_date,
-        'sports_coverage': sports_coverage
-    }
+    buckets = [
+        {
+            'day': row.day.isoformat(),
+            'route': row.route,
+            'plan': row.plan or None,
+            'scope': row.scope or None,
+            'cases': row.case_count,
+            'premium_total': f"{row.premium_total:.2f}"
+        }
+        for row in rows
+    ]
+    total_premium = sum((row.premium_total for row in rows), start=0)
+    return Response({
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'buckets': buckets,
+        'totals': {
+            'cases': sum(bucket['cases'] for bucket in buckets),
+            'premium_total': f"{total_premium:.2f}"
+        }
+    })
@@ -0,0 +1,97 @@
+import hashlib
+import re
+from typing import Iterable, List, Optional
+
+from .preprocess import trim_email_body
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+SHINGLE_SIZE = 3
+
+WORD_RE = re.compile(r'\w+')
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}')
+# Extracted terms that change the quote; they must match exactly as well.
+TERMS_FIELDS = ('direction', 'scope', 'plan', 'coverage_limit', 'days', 'sports_coverage')
+
+
+def normalize_body(body: str, trimmed: bool = False) -> str:
+    """Reduce an email body to the words a resend or forward would keep.
+
+    Uses the same trimming as extraction (quoted replies, forward/reply
+    headers and signatures removed), then folds case and whitespace. Pass
+    ``trimmed=True`` for text that already came out of ``trim_email_body``
+    so it is not scanned a second time.
+    """
+    if not trimmed:
+        body = trim_email_body(body)['text']
+    return ' '.join(body.lower().split())
+
+
+def _shingles(tokens: List[str]) -> Iterable[str]:
+    if len(tokens) < SHINGLE_SIZE:
+        return tokens
+    return (' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1))
+
+
+# SimHash needs, for each of the 64 bit positions, how many shingle hashes
+# have that bit set. Rather than looping over bits per shingle, each hash
+# byte is spread into eight COUNTER_BITS-wide counters of one big integer
+# via a lookup table, so a single addition updates all 64 counts at once.
+COUNTER_BITS = 24
+_COUNTER_MASK = (1 << COUNTER_BITS) - 1
+_SPREAD_BYTE = [
+    [
+        sum(((byte >> j) & 1) << ((position * 8 + j) * COUNTER_BITS) for j in range(8))
+        for byte in range(256)
+    ]
+    for position in range(SIMHASH_BITS // 8)
+]
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word shingles of already normalized text."""
+    counters = 0
+    total = 0
+    for shingle in _shingles(WORD_RE.findall(text)):
+        digest = hashlib.blake2b(shingle.encode(), digest_size=8).digest()
+        for table, byte in zip(_SPREAD_BYTE, reversed(digest)):
+            counters += table[byte]
+        total += 1
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        if 2 * ((counters >> (bit * COUNTER_BITS)) & _COUNTER_MASK) > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash_bands(fingerprint: int) -> List[int]:
+    """Split a fingerprint into equal bands.
+
+    Two fingerprints within Hamming distance ``SIMHASH_BANDS - 1`` share at
+    least one band exactly (pigeonhole), so an index per band finds every
+    near-duplicate candidate without scanning.
+    """
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (i * BAND_BITS)) & mask for i in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def facts_key(body: str, passport_numbers: Iterable[str], terms: Optional[dict] = None,
+              trimmed: bool = False) -> str:
+    """Hash of the facts that must match exactly for two emails to be duplicates.
+
+    Travel dates, passport numbers and the extracted ``terms`` (plan, scope,
+    coverage and the rest of ``TERMS_FIELDS``) are compared exactly rather
+    than through the SimHash, so a resend that asks for another plan, or a
+    new request for the same people on other dates, is never folded into an
+    old case: a one-word change is well within the SimHash threshold.
+    """
+    terms = terms or {}
+    dates = sorted(set(DATE_RE.findall(normalize_body(body, trimmed))))
+    passports = sorted({p.upper() for p in passport_numbers if p})
+    quoted = [f"{field}={terms.get(field)}" for field in TERMS_FIELDS]
+    return hashlib.sha256('|'.join(dates + ['#'] + passports + ['#'] + quoted).encode()).hexdigest()
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.extraction.policy_extractor import extract_policy_data
+from apps.extraction.preprocess import trim_email_body
+
+REQUEST = (
+    "Hello,\nPlease issue an outbound worldwide travel policy, Gold plan, for one traveller "
+    "from 2026-01-10 to 2026-01-24 (15 days).\nPassport attached.\n\nThanks\n-- \n"
+    "Jane Doe | Broker | +961 1 234 567\n"
+)
+QUOTED_MESSAGE = (
+    "On Mon, 5 Jan 2026 at 09:{minute:02d}, Broker <broker@example.com> wrote:\n"
+    "> Could you quote a Silver plan from 2025-0{month}-01 to 2025-0{month}-20 (20 days)?\n"
+    "> We may also need sports coverage for 12 travellers.\n> Regards\n"
+)
+
+
+def build_thread(replies: int) -> str:
+    history = ''.join(
+        QUOTED_MESSAGE.format(minute=i % 60, month=1 + i % 9) for i in range(replies)
+    )
+    return REQUEST + history
+
+
+class Command(BaseCommand):
+    help = 'Show extraction time against email thread length, with and without trimming'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--replies', type=int, nargs='*', default=[0, 10, 100, 1000, 5000])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'replies':>8} {'body KB':>9} {'raw ms':>9} {'trimmed ms':>11} {'removed':>9}")
+        for replies in options['replies']:
+            body = build_thread(replies)
+
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                extract_policy_data(body, '')
+            raw_ms = (time.perf_counter() - started) * 1000 / options['repeat']
+
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                trimmed = trim_email_body(body, settings.EXTRACTION_MAX_SCAN_BYTES)
+                extract_policy_data(trimmed['text'], '')
+            trimmed_ms = (time.perf_counter() - started) * 1000 / options['repeat']
+
+            self.stdout.write(
+                f"{replies:>8} {len(body.encode()) / 1024:>9.1f} {raw_ms:>9.2f} "
+                f"{trimmed_ms:>11.2f} {trimmed['removed_chars']:>9}"
+            )
@@ -0,0 +1,61 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .mrz_parser import MRZParser
+
+_MISSING = object()
+
+
+def mrz_content_hash(ocr_text: str) -> str:
+    """Key for an OCR result; case and surrounding whitespace do not matter to the parser."""
+    return hashlib.sha256(ocr_text.strip().upper().encode()).hexdigest()
+
+
+class MRZParseCache:
+    """Memoize ``MRZParser.parse_passport`` by content hash.
+
+    Lookups go to a bounded in-process LRU first and then to an optional
+    persistent ``store`` (anything with ``get(content_hash)`` returning the
+    parsed dict or ``None``, and ``put(content_hash, parsed)``), so the same
+    passport scan is parsed once across requests and workers. Texts without
+    an MRZ are remembered in the LRU only.
+    """
+
+    def __init__(self, maxsize: int = 1024, store=None, parser: Optional[MRZParser] = None):
+        self.maxsize = maxsize
+        self.store = store
+        self.parser = parser or MRZParser()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, ocr_text: str) -> Tuple[str, Optional[Dict]]:
+        content_hash = mrz_content_hash(ocr_text)
+
+        with self._lock:
+            parsed = self._entries.get(content_hash, _MISSING)
+            if parsed is not _MISSING:
+                self._entries.move_to_end(content_hash)
+                self.hits += 1
+                return content_hash, parsed
+            self.misses += 1
+
+        parsed = self.store.get(content_hash) if self.store is not None else None
+        if parsed is None:
+            parsed = self.parser.parse_passport(ocr_text)
+            if parsed is not None and self.store is not None:
+                self.store.put(content_hash, parsed)
+
+        with self._lock:
+            self._entries[content_hash] = parsed
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return content_hash, parsed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -3,22 +3,26 @@ from datetime import datetime
 from typing import Dict, Optional
 
 
+# First line (after leading whitespace) that starts a passport MRZ. One
+# search instead of stripping every OCR line keeps noisy pages cheap.
+MRZ_LINE1_RE = re.compile(r'^[^\S\n]*P<', re.MULTILINE)
+
+
 class MRZParser:
     
     def parse_passport(self, ocr_text: str) -> Optional[Dict]:
-        lines = ocr_text.upper().split('\n')
+        text = ocr_text.upper()
         
-        line1_idx = None
-        for i, line in enumerate(lines):
-            if re.match(r'^P<', line.strip()):
-                line1_idx = i
-                break
+        match = MRZ_LINE1_RE.search(text)
+        if match is None:
+            return None
         
-        if line1_idx is None or line1_idx + 1 >= len(lines):
+        lines = text[match.start():].split('\n', 2)
+        if len(lines) < 2:
             return None
         
-        line1 = lines[line1_idx].strip().ljust(44, '<')[:44]
-        line2 = lines[line1_idx + 1].strip().ljust(44, '<')[:44]
+        line1 = lines[0].strip().ljust(44, '<')[:44]
+        line2 = lines[1].strip().ljust(44, '<')[:44]
         
         names_part = line1[5:44].replace('<', ' ').strip()
         name_parts = [p for p in names_part.split('  ') if p]
@@ -0,0 +1,130 @@
+import re
+
+
+INTENT_PATTERNS = [
+    re.compile(pattern) for pattern in [
+        r'travel\s+insurance',
+        r'\binsurance\b',
+        r'\bpolic(y|ies)\b',
+        r'\bcover(age)?\b',
+        r'\bissue',
+        r'\barrange',
+        r'\bprovide',
+        r'\binsure',
+        r'\bquote'
+    ]
+]
+INBOUND_RE = re.compile(r'\binbound\b')
+OUTBOUND_RE = re.compile(r'\boutbound\b')
+WW_EXCL_US_CA_RE = re.compile(r'(worldwide\s+excluding|world\s+except|excl\.?\s*(us|usa|canada)|excluding\s*(us|usa|canada)|excluding\s+country\s+of\s+residence)')
+WORLDWIDE_RE = re.compile(r'worldwide')
+EUROPE_RE = re.compile(r'(europe|greece)')
+PLAN_PATTERNS = [
+    (re.compile(r'\bplatinum\b'), 'Platinum'),
+    (re.compile(r'gold\s+plus'), 'Gold Plus'),
+    (re.compile(r'\bgold\b'), 'Gold'),
+    (re.compile(r'\bsilver\b'), 'Silver'),
+]
+# Digit runs are bounded (and durations anchored to the start of a run) so a
+# long run of digits cannot make these searches quadratic or overflow int().
+COVERAGE_RE = re.compile(r'\$?\s?(\d{1,6}),?(\d{3})')
+DAYS_RE = re.compile(r'(?<!\d)(\d{1,4})\s+days?')
+DURATION_PATTERNS = [
+    (re.compile(r'(?<!\d)(\d{1,3})\s+weeks?'), 7),
+    (re.compile(r'(?<!\d)(\d{1,3})\s+months?'), 30),
+]
+ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+DATE_PATTERNS = [
+    (re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})'), 'dmy'),
+    (re.compile(r'(\d{4})[/-](\d{1,2})[/-](\d{1,2})'), 'ymd'),
+]
+SPORTS_RE = re.compile(r'(sports?\s+coverage|sports?\s+activit|motorcycle)')
+
+
+def extract_policy_data(body: str, subject: str) -> dict:
+    lowered = body.lower()
+    intent_ok = any(pattern.search(lowered) for pattern in INTENT_PATTERNS)
+    
+    direction = None
+    scope = None
+    if INBOUND_RE.search(lowered):
+        direction = 'INBOUND'
+        scope = 'INBOUND'
+    elif OUTBOUND_RE.search(lowered):
+        direction = 'OUTBOUND'
+    
+    if scope != 'INBOUND':
+        if WW_EXCL_US_CA_RE.search(lowered):
+            scope = 'WW_EXCL_US_CA'
+        elif WORLDWIDE_RE.search(lowered):
+            scope = 'WORLDWIDE'
+    
+    if scope is None and EUROPE_RE.search(lowered):
+        scope = 'WW_EXCL_US_CA'
+    
+    plan = None
+    for pattern, plan_name in PLAN_PATTERNS:
+        if pattern.search(lowered):
+            plan = plan_name
+            break
+    
+    coverage_match = COVERAGE_RE.search(body)
+    if coverage_match and not plan:
+        coverage_str = coverage_match.group(1) + coverage_match.group(2)
+        coverage = int(coverage_str)
+        if coverage == 50000 or coverage == 50:
+            plan = 'Silver'
+        elif coverage == 100000 or coverage == 100:
+            plan = 'Gold'
+        elif coverage == 300000 or coverage == 300:
+            plan = 'Gold Plus'
+        elif coverage == 500000 or coverage == 500:
+            plan = 'Platinum'
+    
+    days = None
+    days_match = DAYS_RE.search(lowered)
+    if days_match:
+        days = int(days_match.group(1))
+    
+    if not days:
+        for pattern, multiplier in DURATION_PATTERNS:
+            match = pattern.search(lowered)
+            if match:
+                days = int(match.group(1)) * multiplier
+                break
+    
+    start_date = None
+    end_date = None
+    date_matches = ISO_DATE_RE.findall(body)
+    if len(date_matches) >= 2:
+        start_date = f"{date_matches[0][0]}-{date_matches[0][1]}-{date_matches[0][2]}"
+        end_date = f"{date_matches[1][0]}-{date_matches[1][1]}-{date_matches[1][2]}"
+    
+    if not start_date:
+        for pattern, format_type in DATE_PATTERNS:
+            matches = pattern.findall(body)
+            if len(matches) >= 2:
+                try:
+                    if format_type == 'dmy':
+                        start_date = f"{matches[0][2]}-{matches[0][1].zfill(2)}-{matches[0][0].zfill(2)}"
+                        end_date = f"{matches[1][2]}-{matches[1][1].zfill(2)}-{matches[1][0].zfill(2)}"
+                    elif format_type == 'ymd':
+                        start_date = f"{matches[0][0]}-{matches[0][1].zfill(2)}-{matches[0][2].zfill(2)}"
+                        end_date = f"{matches[1][0]}-{matches[1][1].zfill(2)}-{matches[1][2].zfill(2)}"
+                    break
+                except (IndexError, ValueError):
+                    continue
+    
+    sports_coverage = bool(SPORTS_RE.search(lowered))
+    
+    return {
+        'intent_ok': intent_ok,
+        'direction': direction,
+        'scope': scope,
+        'plan': plan,
+        'coverage_limit': None,
+        'days': days,
+        'start_date': start_date,
+        'end_date': end_date,
+        'sports_coverage': sports_coverage
+    }
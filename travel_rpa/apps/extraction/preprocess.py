@@ -0,0 +1,110 @@
+import html
+import re
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_SCAN_BYTES = 16384
+# Markup and quoted history are cheap to discard but can dwarf the message
+# itself, so a larger (still bounded) prefix of the raw body is examined.
+RAW_SCAN_FACTOR = 8
+
+HTML_TAG_RE = re.compile(r'<[a-zA-Z/!][^<>]{0,2000}>')
+HTML_BLOCK_RE = re.compile(r'<(style|script|head)\b.{0,100000}?</\1\s*>', re.IGNORECASE | re.DOTALL)
+HTML_BREAK_RE = re.compile(r'<\s*(br|/p|/div|/tr|/li)\b[^<>]{0,200}>', re.IGNORECASE)
+QUOTED_LINE_RE = re.compile(r'^\s*>')
+REPLY_HEADER_RE = re.compile(r'^\s*on\b.{0,300}\bwrote:\s*$', re.IGNORECASE)
+ORIGINAL_MESSAGE_RE = re.compile(r'^\s*-{2,}\s*original message\s*-{2,}\s*$', re.IGNORECASE)
+FORWARD_MARKER_RE = re.compile(r'^\s*-{2,}\s*forwarded message\s*-{2,}\s*$', re.IGNORECASE)
+HEADER_FIELD_RE = re.compile(r'^\s*(from|sent|date|to|cc|subject):', re.IGNORECASE)
+OUTLOOK_FOLLOWUP_RE = re.compile(r'^\s*(sent|date):', re.IGNORECASE)
+SIGNATURE_RE = re.compile(r'^(--|__+)\s*$|^\s*sent from my \w+', re.IGNORECASE)
+
+
+def _strip_html(body: str) -> str:
+    if not HTML_TAG_RE.search(body):
+        return body
+    text = HTML_BLOCK_RE.sub('', body)
+    text = HTML_BREAK_RE.sub('\n', text)
+    text = HTML_TAG_RE.sub('', text)
+    return html.unescape(text)
+
+
+def _is_reply_header(lines: List[str], i: int) -> bool:
+    # Gmail wraps long "On <date>, <name> <address> wrote:" lines in two.
+    if REPLY_HEADER_RE.match(lines[i]):
+        return True
+    return (i + 1 < len(lines) and lines[i].lstrip().lower().startswith('on ')
+            and bool(REPLY_HEADER_RE.match(lines[i] + ' ' + lines[i + 1])))
+
+
+def _is_outlook_header(lines: List[str], i: int) -> bool:
+    if not lines[i].lstrip().lower().startswith('from:'):
+        return False
+    return any(OUTLOOK_FOLLOWUP_RE.match(line) for line in lines[i + 1:i + 4])
+
+
+def trim_email_body(body: str, max_bytes: Optional[int] = DEFAULT_MAX_SCAN_BYTES) -> Dict:
+    """Reduce an email body to the text of the newest message for extraction.
+
+    Removes HTML markup, quoted reply history (``>`` lines and everything
+    after an "On ... wrote:" / "Original Message" / Outlook header), the
+    header block of forwarded messages (the forwarded text itself is kept,
+    since it is usually the request) and signatures, then caps the result at
+    ``max_bytes`` of UTF-8. Returns the text together with counts of what
+    was removed so callers can report it; the original body is untouched.
+    """
+    original_chars = len(body)
+    if max_bytes is not None:
+        body = body[:max_bytes * RAW_SCAN_FACTOR]
+    text = _strip_html(body)
+    html_removed = len(body) - len(text)
+
+    lines = text.splitlines()
+    kept = []
+    quoted = []
+    cut_at = None
+    skipping_headers = False
+    for i, line in enumerate(lines):
+        if skipping_headers:
+            if HEADER_FIELD_RE.match(line) or not line.strip():
+                continue
+            skipping_headers = False
+        if (_is_reply_header(lines, i) or ORIGINAL_MESSAGE_RE.match(line)
+                or _is_outlook_header(lines, i)):
+            cut_at = i
+            break
+        if SIGNATURE_RE.match(line):
+            cut_at = i
+            break
+        if FORWARD_MARKER_RE.match(line):
+            skipping_headers = True
+            continue
+        if QUOTED_LINE_RE.match(line):
+            quoted.append(line)
+            continue
+        kept.append(line)
+
+    # A bare "see below" reply has nothing of its own; fall back to the
+    # quoted request rather than extracting from an empty string.
+    if not ''.join(kept).strip() and quoted:
+        kept = [QUOTED_LINE_RE.sub('', line) for line in quoted]
+
+    result = '\n'.join(kept).strip()
+    history_removed = len(text) - len(result)
+
+    truncated = False
+    if max_bytes is not None:
+        encoded = result.encode()
+        if len(encoded) > max_bytes:
+            result = encoded[:max_bytes].decode(errors='ignore')
+            truncated = True
+
+    return {
+        'text': result,
+        'original_chars': original_chars,
+        'scanned_chars': len(result),
+        'removed_chars': original_chars - len(result),
+        'html_removed_chars': html_removed,
+        'history_removed_chars': history_removed,
+        'reply_cut': cut_at is not None,
+        'truncated': truncated,
+    }
@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class IssuanceError(Exception):
+    """The portal failed or rejected the issuance (the view answers 502)."""
+
+
+class IssuanceUnavailable(IssuanceError):
+    """The portal or the browser could not be reached; worth retrying (503)."""
+
+
+class IssuanceNotConfigured(IssuanceError):
+    """No portal is configured, so there is nothing to issue against (503)."""
+
+
+class IssuanceDriver(ABC):
+    """Issues (or simulates issuing) a policy on the insurer's portal.
+
+    ``simulate_issuance`` takes the case summary sent by the issuance view and
+    returns ``simulated_policy_number``, ``timestamp`` and the raw bytes of
+    ``policy_pdf`` and ``screenshot_png`` (``None`` when the driver has no
+    such document); the view stores those in the artifact store. Failures
+    are raised as ``IssuanceError`` / ``IssuanceUnavailable``.
+    """
+
+    @abstractmethod
+    def simulate_issuance(self, case_data: dict) -> dict:
+        ...
+
+
+_http_driver = None
+
+
+def get_driver(screenshot: bool = False) -> IssuanceDriver:
+    """Pick the driver for one issuance; a browser is only started for screenshots."""
+    if settings.ISSUANCE_DRIVER not in ('http', 'playwright'):
+        raise ImproperlyConfigured(f"Unknown ISSUANCE_DRIVER: {settings.ISSUANCE_DRIVER}")
+    if not settings.ISSUANCE_PORTAL_URL:
+        raise IssuanceNotConfigured(
+            'ISSUANCE_PORTAL_URL is not set (run_mock_portal serves one for local work)'
+        )
+
+    if screenshot or settings.ISSUANCE_DRIVER == 'playwright':
+        from .simulator import PlaywrightSimulator
+        return PlaywrightSimulator(settings.ISSUANCE_PORTAL_URL)
+
+    # One shared instance so every request reuses the same connection pool.
+    global _http_driver
+    if _http_driver is None or _http_driver.portal_url != settings.ISSUANCE_PORTAL_URL.rstrip('/'):
+        from .http_driver import HTTPIssuanceDriver
+        _http_driver = HTTPIssuanceDriver(settings.ISSUANCE_PORTAL_URL)
+    return _http_driver
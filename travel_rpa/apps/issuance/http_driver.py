@@ -0,0 +1,52 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from .drivers import IssuanceDriver, IssuanceError, IssuanceUnavailable
+
+
+class HTTPIssuanceDriver(IssuanceDriver):
+    """Posts the issuance form straight to the portal over a pooled session."""
+
+    def __init__(self, portal_url: str, pool_size: int = 8, timeout: float = 10.0):
+        self.portal_url = portal_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def simulate_issuance(self, case_data: dict) -> dict:
+        try:
+            return self._issue(case_data)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            raise IssuanceUnavailable(f"portal unreachable: {exc}") from exc
+        except (requests.RequestException, ValueError, KeyError) as exc:
+            raise IssuanceError(f"portal error: {exc}") from exc
+
+    def _issue(self, case_data: dict) -> dict:
+        response = self.session.post(
+            f"{self.portal_url}/policies",
+            data={
+                'case_id': case_data.get('case_id', 'unknown'),
+                'plan': case_data.get('plan') or 'N/A',
+                'scope': case_data.get('scope') or 'N/A',
+                'days': case_data.get('days') or 0,
+            },
+            headers={'Accept': 'application/json'},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        issued = response.json()
+
+        policy_pdf = None
+        if issued.get('document_url'):
+            document = self.session.get(f"{self.portal_url}{issued['document_url']}", timeout=self.timeout)
+            document.raise_for_status()
+            policy_pdf = document.content
+
+        return {
+            'policy_pdf': policy_pdf,
+            'screenshot_png': None,
+            'simulated_policy_number': issued['policy_number'],
+            'timestamp': issued['issued_at']
+        }
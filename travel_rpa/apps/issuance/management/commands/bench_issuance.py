@@ -0,0 +1,61 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.issuance.http_driver import HTTPIssuanceDriver
+from apps.issuance.mock_portal import serve_in_background
+
+
+class Command(BaseCommand):
+    help = 'Compare issuance throughput of the HTTP and Playwright drivers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--playwright-iterations', type=int, default=5,
+            help='Browser runs are slow; keep this small (0 to skip)'
+        )
+
+    def handle(self, *args, **options):
+        # Both drivers issue against the same mock portal (form post plus PDF
+        # download), so the difference is the browser, not the endpoint.
+        server, portal_url = serve_in_background()
+        try:
+            self._report('http', HTTPIssuanceDriver(portal_url, pool_size=options['concurrency']),
+                         options['iterations'], options['concurrency'])
+
+            if options['playwright_iterations']:
+                try:
+                    import playwright  # noqa: F401
+                except ImportError:
+                    self.stdout.write('playwright: not installed, skipped')
+                    return
+                from apps.issuance.simulator import PlaywrightSimulator
+                self._report('playwright', PlaywrightSimulator(portal_url),
+                             options['playwright_iterations'], 1)
+        finally:
+            server.shutdown()
+
+    def _report(self, name, driver, iterations, concurrency):
+        def issue(_):
+            started = time.perf_counter()
+            driver.simulate_issuance({
+                'case_id': str(uuid.uuid4()), 'plan': 'Gold', 'scope': 'WORLDWIDE', 'days': 14
+            })
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = sorted(pool.map(issue, range(iterations)))
+        elapsed = time.perf_counter() - started
+
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f"{name}: {iterations} issuances in {elapsed:.2f}s "
+            f"({iterations / elapsed:.1f}/s), p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p95 {p95 * 1000:.1f} ms"
+        )
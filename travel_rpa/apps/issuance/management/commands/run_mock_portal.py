@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.issuance.mock_portal import serve
+
+
+class Command(BaseCommand):
+    help = 'Serve the local mock issuance portal used by the HTTP issuance driver'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        server = serve(options['host'], options['port'])
+        self.stdout.write(f"Mock issuance portal on http://{options['host']}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
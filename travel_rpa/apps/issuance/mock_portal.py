@@ -0,0 +1,147 @@
+"""Minimal stand-in for the insurer's issuance portal.
+
+A plain WSGI app so it can run next to the service (``manage.py
+run_mock_portal``) or inside a test thread without Django or a browser.
+"""
+import html
+import json
+import threading
+import time
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+
+ISSUE_FORM = """<!doctype html>
+<title>Issue policy</title>
+<form method="post" action="/policies">
+  <label>Case <input name="case_id"></label>
+  <label>Plan <input name="plan"></label>
+  <label>Scope <input name="scope"></label>
+  <label>Days <input name="days"></label>
+  <button type="submit">Issue</button>
+</form>
+"""
+
+ISSUED_PAGE = """<!doctype html>
+<title>Policy issued</title>
+<dl>
+  <dt>Policy</dt><dd id="policy-number">{policy_number}</dd>
+  <dt>Plan</dt><dd>{plan} / {scope} / {days} days</dd>
+</dl>
+<a id="policy-document" href="{document_url}">Policy schedule (PDF)</a>
+"""
+
+
+def policy_number_for(case_id: str) -> str:
+    return f"TP-{str(case_id)[:8].upper()}"
+
+
+def policy_document(policy_number: str) -> bytes:
+    """A one-page PDF standing in for the portal's policy schedule."""
+    text = f"Travel insurance policy {policy_number}".replace('(', '').replace(')', '')
+    content = f"BT /F1 18 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+def application(environ, start_response):
+    method = environ['REQUEST_METHOD']
+    path = environ.get('PATH_INFO', '/')
+
+    if method == 'GET' and path == '/health':
+        return _json(start_response, '200 OK', {'status': 'ok'})
+
+    if method == 'GET' and path == '/policies/new':
+        return _html(start_response, '200 OK', ISSUE_FORM)
+
+    if method == 'POST' and path == '/policies':
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        form = parse_qs(environ['wsgi.input'].read(length).decode())
+        case_id = form.get('case_id', [''])[0]
+        if not case_id:
+            return _json(start_response, '400 Bad Request', {'error': 'case_id is required'})
+        policy_number = policy_number_for(case_id)
+        issued = {
+            'policy_number': policy_number,
+            'document_url': f"/policies/{policy_number}.pdf",
+            'plan': form.get('plan', ['N/A'])[0],
+            'scope': form.get('scope', ['N/A'])[0],
+            'days': int(form.get('days', ['0'])[0]),
+            'issued_at': time.time(),
+        }
+        # A browser submitting the form gets a result page, API clients JSON.
+        if 'text/html' in environ.get('HTTP_ACCEPT', ''):
+            return _html(start_response, '201 Created', ISSUED_PAGE.format(
+                **{key: html.escape(str(value)) for key, value in issued.items()}
+            ))
+        return _json(start_response, '201 Created', issued)
+
+    if method == 'GET' and path.startswith('/policies/') and path.endswith('.pdf'):
+        body = policy_document(path[len('/policies/'):-len('.pdf')])
+        start_response('200 OK', [
+            ('Content-Type', 'application/pdf'),
+            ('Content-Length', str(len(body))),
+        ])
+        return [body]
+
+    return _json(start_response, '404 Not Found', {'error': 'not found'})
+
+
+def _html(start_response, status, page):
+    body = page.encode()
+    start_response(status, [
+        ('Content-Type', 'text/html; charset=utf-8'),
+        ('Content-Length', str(len(body))),
+    ])
+    return [body]
+
+
+def _json(start_response, status, payload):
+    body = json.dumps(payload).encode()
+    start_response(status, [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body))),
+    ])
+    return [body]
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765, quiet: bool = False):
+    """Create a threaded server; call ``serve_forever`` on the result."""
+    return make_server(
+        host, port, application,
+        server_class=_ThreadingWSGIServer,
+        handler_class=_QuietHandler if quiet else WSGIRequestHandler
+    )
+
+
+def serve_in_background(host: str = '127.0.0.1', port: int = 0):
+    """Start a quiet portal on a daemon thread; returns ``(server, base_url)``."""
+    server = serve(host, port, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
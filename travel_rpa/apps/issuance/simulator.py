@@ -1,36 +1,56 @@
-from playwright.sync_api import sync_playwright
-from pathlib import Path
 import time
 
+from .drivers import IssuanceDriver, IssuanceError, IssuanceUnavailable
 
-class PlaywrightSimulator:
+
+class PlaywrightSimulator(IssuanceDriver):
+    """Drives Chromium through the issuance form.
+
+    The browser fills in the portal's form at ``/policies/new``, reads the
+    policy number from the result page and downloads the policy PDF, so it
+    does the same work as the HTTP driver plus rendering.
+    """
+    
+    def __init__(self, portal_url: str, timeout: float = 30.0):
+        self.portal_url = portal_url.rstrip('/')
+        self.timeout_ms = timeout * 1000
     
     def simulate_issuance(self, case_data: dict) -> dict:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            page.goto('https://www.google.com')
-            
-            search_query = (
-                f"Travel Policy Issuance: {case_data.get('plan', 'N/A')} "
-                f"{case_data.get('scope', 'N/A')} {case_data.get('days', 0)} days"
-            )
-            page.fill('textarea[name="q"]', search_query)
-            
-            case_id = case_data.get('case_id', 'unknown')
-            screenshot_dir = Path('/tmp/issuance_screenshots')
-            screenshot_dir.mkdir(exist_ok=True)
-            screenshot_path = screenshot_dir / f"issuance_{case_id}.png"
-            page.screenshot(path=str(screenshot_path))
-            
-            browser.close()
-            
-            policy_number = f"TP-{str(case_id)[:8].upper()}"
-            
-            return {
-                'screenshot_path': str(screenshot_path),
-                'screenshot_url': None,
-                'simulated_policy_number': policy_number,
-                'timestamp': time.time()
-            }
+        try:
+            from playwright.sync_api import Error, TimeoutError as PlaywrightTimeout, sync_playwright
+        except ImportError as exc:
+            raise IssuanceUnavailable('playwright is not installed') from exc
+        
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                try:
+                    page = browser.new_page()
+                    page.set_default_timeout(self.timeout_ms)
+                    return self._issue_on_portal(page, case_data)
+                finally:
+                    browser.close()
+        except PlaywrightTimeout as exc:
+            raise IssuanceUnavailable(f"browser timed out: {exc}") from exc
+        except Error as exc:
+            raise IssuanceError(f"browser error: {exc}") from exc
+    
+    def _issue_on_portal(self, page, case_data: dict) -> dict:
+        page.goto(f"{self.portal_url}/policies/new")
+        page.fill('input[name="case_id"]', str(case_data.get('case_id', 'unknown')))
+        page.fill('input[name="plan"]', case_data.get('plan') or 'N/A')
+        page.fill('input[name="scope"]', case_data.get('scope') or 'N/A')
+        page.fill('input[name="days"]', str(case_data.get('days') or 0))
+        page.click('button[type="submit"]')
+        
+        policy_number = page.inner_text('#policy-number')
+        document_url = page.get_attribute('#policy-document', 'href')
+        screenshot_png = page.screenshot()
+        policy_pdf = page.request.get(f"{self.portal_url}{document_url}").body() if document_url else None
+        
+        return {
+            'policy_pdf': policy_pdf,
+            'screenshot_png': screenshot_png,
+            'simulated_policy_number': policy_number.strip(),
+            'timestamp': time.time()
+        }
@@ -1,38 +1,22 @@
-import csv
-import yaml
 from decimal import Decimal
 from pathlib import Path
 from typing import List, Dict, Any
 
+from .tariff_loader import load_tariffs, load_rules, TARIFFS_PATH, RULES_PATH
+
 
 class PricingEngine:
-    def __init__(self):
+    def __init__(self, tariffs_path: Path = TARIFFS_PATH, rules_path: Path = RULES_PATH):
+        self.tariffs_path = Path(tariffs_path)
+        self.rules_path = Path(rules_path)
         self.tariffs = self._load_tariffs()
         self.rules = self._load_rules()
     
     def _load_tariffs(self) -> Dict:
-        tariffs = {}
-        data_dir = Path(__file__).parent.parent.parent / 'data'
-        with open(data_dir / 'tariffs.csv') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = (
-                    row['scope'],
-                    row['plan'],
-                    int(row['band_min']),
-                    int(row['band_max'])
-                )
-                tariffs[key] = {
-                    'premium': Decimal(row['premium_usd']),
-                    'currency': row['currency'],
-                    'coverage_limit': int(row['coverage_limit'])
-                }
-        return tariffs
+        return load_tariffs(self.tariffs_path)
     
     def _load_rules(self) -> Dict:
-        data_dir = Path(__file__).parent.parent.parent / 'data'
-        with open(data_dir / 'rules.yml') as f:
-            return yaml.safe_load(f)
+        return load_rules(self.rules_path)
     
     def calculate_premium(
         self,
@@ -0,0 +1,178 @@
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.core.db_router import replica_reads
+from apps.core.models import Case, Traveller
+from apps.pricing.engine import PricingEngine
+from apps.pricing.repricing import check_rules, reprice_chunk
+from apps.pricing.tariff_loader import RULES_PATH, TARIFFS_PATH
+
+CSV_FIELDS = [
+    'case_id', 'received_at', 'scope', 'plan', 'days', 'travellers',
+    'stored_total', 'candidate_total', 'delta', 'error'
+]
+
+
+def iter_case_chunks(since: datetime, until: datetime, chunk_size: int):
+    """Yield lists of case tuples (with traveller ages) without loading the table."""
+    cases = (
+        Case.objects.filter(
+            route='success', premium_total__isnull=False,
+            received_at__gte=since, received_at__lt=until
+        )
+        .order_by('received_at', 'case_id')
+        .values_list('case_id', 'received_at', 'scope', 'plan', 'days', 'sports_coverage', 'premium_total')
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        chunk = list(islice(cases, chunk_size))
+        if not chunk:
+            return
+        ages = {}
+        for case_id, age in (
+            Traveller.objects.filter(case_id__in=[row[0] for row in chunk])
+            .order_by('id').values_list('case_id', 'age_at_travel')
+        ):
+            ages.setdefault(case_id, []).append(age)
+        yield [
+            (str(row[0]), row[1].isoformat(), *row[2:], ages.get(row[0], []))
+            for row in chunk
+        ]
+
+
+class Totals:
+    def __init__(self):
+        self.cases = 0
+        self.errors = 0
+        self.stored = Decimal('0')
+        self.candidate = Decimal('0')
+
+    def add(self, result: dict) -> None:
+        self.cases += 1
+        if result['error']:
+            self.errors += 1
+            return
+        self.stored += result['stored_total']
+        self.candidate += result['candidate_total']
+
+    def as_dict(self) -> dict:
+        delta = self.candidate - self.stored
+        return {
+            'cases': self.cases,
+            'errors': self.errors,
+            'stored_total': f"{self.stored:.2f}",
+            'candidate_total': f"{self.candidate:.2f}",
+            'delta': f"{delta:.2f}",
+            'delta_pct': f"{delta / self.stored * 100:.2f}" if self.stored else None,
+        }
+
+
+class Command(BaseCommand):
+    help = 'Reprice historical cases under a candidate tariff sheet and report the revenue change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tariffs', default=str(TARIFFS_PATH), help='Candidate tariffs.csv')
+        parser.add_argument('--rules', default=str(RULES_PATH), help='Candidate rules.yml')
+        parser.add_argument('--since', help='First received date (default: one year ago)')
+        parser.add_argument('--until', help='Last received date, inclusive (default: today)')
+        parser.add_argument('--output', default='reprice.csv', help="Per-case deltas CSV ('-' for stdout)")
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes; 0 prices in this process'
+        )
+        parser.add_argument('--json', action='store_true', help='Print totals as JSON')
+
+    def handle(self, *args, **options):
+        for key in ('tariffs', 'rules'):
+            if not os.path.exists(options[key]):
+                raise CommandError(f"{options[key]} does not exist")
+        # Fail on a malformed sheet before reading any cases.
+        engine = PricingEngine(options['tariffs'], options['rules'])
+        try:
+            check_rules(engine.rules)
+        except ValueError as exc:
+            raise CommandError(f"{options['rules']}: {exc}")
+
+        today = timezone.localdate()
+        until = parse_date(options['until']) if options['until'] else today
+        since = parse_date(options['since']) if options['since'] else until - timedelta(days=365)
+        if since is None or until is None:
+            raise CommandError('--since/--until must be YYYY-MM-DD')
+        tz = timezone.get_current_timezone()
+        window = (
+            timezone.make_aware(datetime.combine(since, dt_time.min), tz),
+            timezone.make_aware(datetime.combine(until + timedelta(days=1), dt_time.min), tz),
+        )
+
+        overall, by_product = Totals(), {}
+        out = sys.stdout if options['output'] == '-' else open(options['output'], 'w', newline='')
+        try:
+            writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            # Read-only over historical rows, so the replica is fine.
+            with replica_reads():
+                chunks = iter_case_chunks(*window, options['chunk_size'])
+                for results in self._reprice(chunks, options):
+                    for result in results:
+                        writer.writerow(result)
+                        overall.add(result)
+                        by_product.setdefault((result['scope'], result['plan']), Totals()).add(result)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        report = {
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+            'tariffs': options['tariffs'],
+            'rules': options['rules'],
+            'totals': overall.as_dict(),
+            'by_product': [
+                {'scope': scope, 'plan': plan, **totals.as_dict()}
+                for (scope, plan), totals in sorted(by_product.items(), key=str)
+            ],
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{'scope':<16} {'plan':<10} {'cases':>7} {'stored':>12} {'candidate':>12} {'delta %':>8}")
+        for row in report['by_product'] + [{'scope': 'TOTAL', 'plan': '', **report['totals']}]:
+            self.stdout.write(
+                f"{row['scope'] or '-':<16} {row['plan'] or '-':<10} {row['cases']:>7} "
+                f"{row['stored_total']:>12} {row['candidate_total']:>12} {row['delta_pct'] or '-':>8}"
+            )
+        if overall.errors:
+            self.stdout.write(f"{overall.errors} cases could not be priced under the candidate sheet")
+
+    def _reprice(self, chunks, options):
+        """Yield repriced chunks in case order, keeping at most 2 chunks per worker in flight."""
+        args = (options['tariffs'], options['rules'])
+        if options['workers'] == 0:
+            for rows in chunks:
+                yield reprice_chunk(*args, rows)
+            return
+
+        # Workers only price; spawned so they never inherit the database connection.
+        pending = deque()
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as pool:
+            for rows in chunks:
+                pending.append(pool.submit(reprice_chunk, *args, rows))
+                if len(pending) >= 2 * options['workers']:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
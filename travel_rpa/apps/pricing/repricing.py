@@ -0,0 +1,80 @@
+from numbers import Number
+from typing import List
+
+from .engine import PricingEngine
+
+# rules.yml entries calculate_premium reads without a default.
+REQUIRED_RULES = {
+    'age_load': ('senior_age_min', 'senior_age_max', 'senior_multiplier'),
+    'sports_load': ('multiplier',),
+}
+
+
+def check_rules(rules) -> None:
+    """Raise ``ValueError`` naming the first entry a candidate rules file lacks.
+
+    Run before pricing so a bad sheet stops ``reprice`` up front instead of
+    failing every case (or a worker) part-way through.
+    """
+    if not isinstance(rules, dict):
+        raise ValueError('rules file must be a mapping')
+    for section, keys in REQUIRED_RULES.items():
+        values = rules.get(section)
+        if not isinstance(values, dict):
+            raise ValueError(f"missing section '{section}'")
+        for key in keys:
+            if not isinstance(values.get(key), Number):
+                raise ValueError(f"'{section}.{key}' must be a number")
+    if not isinstance(rules.get('fees'), dict):
+        raise ValueError("missing section 'fees'")
+    tiers = rules.get('group_discount_tiers')
+    if not isinstance(tiers, list):
+        raise ValueError("'group_discount_tiers' must be a list")
+    for i, tier in enumerate(tiers):
+        if not isinstance(tier, dict):
+            raise ValueError(f"group_discount_tiers[{i}] must be a mapping")
+        for key in ('min_travellers', 'discount_rate'):
+            if not isinstance(tier.get(key), Number):
+                raise ValueError(f"'group_discount_tiers[{i}].{key}' must be a number")
+
+
+def reprice_chunk(tariffs_path: str, rules_path: str, rows: List[tuple]) -> List[dict]:
+    """Price one chunk of case tuples under the candidate sheet.
+
+    Used by ``manage.py reprice`` in its worker processes, so it only takes
+    plain tuples and never imports Django. Tariff and rules files are parsed
+    once per process. A case that fails to price is reported in its
+    ``error`` field rather than aborting the chunk.
+    """
+    engine = PricingEngine(tariffs_path, rules_path)
+    results = []
+    for case_id, received_at, scope, plan, days, sports, stored_total, ages in rows:
+        result = {
+            'case_id': case_id,
+            'received_at': received_at,
+            'scope': scope,
+            'plan': plan,
+            'days': days,
+            'travellers': len(ages),
+            'stored_total': stored_total,
+            'candidate_total': None,
+            'delta': None,
+            'error': '',
+        }
+        try:
+            pricing = engine.calculate_premium(
+                scope=scope,
+                plan=plan,
+                days=days,
+                travellers=[{'age_at_travel': age} for age in ages],
+                sports_flag=sports
+            )
+        except ValueError as exc:
+            result['error'] = str(exc)
+        except Exception as exc:
+            result['error'] = f"{type(exc).__name__}: {exc}"
+        else:
+            result['candidate_total'] = pricing['total']
+            result['delta'] = pricing['total'] - stored_total
+        results.append(result)
+    return results
@@ -0,0 +1,38 @@
+import csv
+import yaml
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+DATA_DIR = Path(__file__).parent.parent.parent / 'data'
+TARIFFS_PATH = DATA_DIR / 'tariffs.csv'
+RULES_PATH = DATA_DIR / 'rules.yml'
+
+
+@lru_cache(maxsize=None)
+def load_tariffs(path: Path = TARIFFS_PATH) -> Dict:
+    """Parse a tariff sheet once per process; callers must not mutate the result."""
+    tariffs = {}
+    with open(path) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            key = (
+                row['scope'],
+                row['plan'],
+                int(row['band_min']),
+                int(row['band_max'])
+            )
+            tariffs[key] = {
+                'premium': Decimal(row['premium_usd']),
+                'currency': row['currency'],
+                'coverage_limit': int(row['coverage_limit'])
+            }
+    return tariffs
+
+
+@lru_cache(maxsize=None)
+def load_rules(path: Path = RULES_PATH) -> Dict:
+    """Parse a rules file once per process; callers must not mutate the result."""
+    with open(path) as f:
+        return yaml.safe_load(f)
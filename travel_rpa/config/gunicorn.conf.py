@@ -0,0 +1,23 @@
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+# Enough threads for every admitted and queued webhook request (see
+# ADMISSION_LIMITS) plus a few for reads; the admission gates, not the thread
+# count, bound the actual work, and a queued request only waits on a lock.
+threads = int(os.environ.get('GUNICORN_THREADS', '18'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '300'))
+
+# Import the Django application in the master so tariffs, rules and compiled
+# extraction patterns are loaded once and shared copy-on-write by the workers.
+preload_app = True
+
+
+def when_ready(server):
+    from apps.core.warmup import warm_up
+    warm_up()
+
+
+def post_worker_init(worker):
+    from apps.core.profiling import install_signal_handler
+    install_signal_handler()
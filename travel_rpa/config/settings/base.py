@@ -25,12 +25,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.admission.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'apps.core.compression.RequestDecompressionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.db_router.ReplicaRoutingMiddleware',
+    'apps.core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -64,6 +68,21 @@ DATABASES = {
     }
 }
 
+# Optional read replica for read-only views and exports (see apps.core.db_router).
+DATABASE_REPLICA_ALIAS = 'replica'
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+# How long a client that wrote keeps reading from the primary (the db_pin
+# cookie); cover the replica's worst expected lag. 0 disables the cookie.
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', '5'))
+
+DATABASE_ROUTERS = ['apps.core.db_router.PrimaryReplicaRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -95,10 +114,88 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
+        'apps.core.formats.MessagePackRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
+        'apps.core.formats.MessagePackParser',
     ],
 }
 
 N8N_WEBHOOK_SECRET = os.environ.get('N8N_WEBHOOK_SECRET', '')
+
+# Near-duplicate detection: a resent or forwarded request is linked to the
+# existing case when its SimHash is within this many bits (0-3) of a case
+# received in the window and its dates and passport numbers match exactly.
+NEAR_DUPLICATE_DETECTION = os.environ.get('NEAR_DUPLICATE_DETECTION', 'true').lower() == 'true'
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.environ.get('NEAR_DUPLICATE_MAX_DISTANCE', '3'))
+NEAR_DUPLICATE_WINDOW_HOURS = int(os.environ.get('NEAR_DUPLICATE_WINDOW_HOURS', '72'))
+
+# Issuance driver: 'http' posts the form to the portal at ISSUANCE_PORTAL_URL
+# directly; 'playwright' drives a browser through the same form. A browser is
+# used regardless when a screenshot is requested. Without a portal URL the
+# issuance endpoint answers 503 (run_mock_portal serves one locally).
+ISSUANCE_PORTAL_URL = os.environ.get('ISSUANCE_PORTAL_URL', '')
+ISSUANCE_DRIVER = os.environ.get('ISSUANCE_DRIVER', 'http')
+
+# Upper bound on the bytes of (trimmed) email text the extraction regexes scan.
+EXTRACTION_MAX_SCAN_BYTES = int(os.environ.get('EXTRACTION_MAX_SCAN_BYTES', '16384'))
+
+# Spool directory watched by `manage.py ingest_worker` (incoming/ -> done/ | failed/).
+INGEST_SPOOL_DIR = os.environ.get('INGEST_SPOOL_DIR', str(BASE_DIR / 'spool'))
+
+# Concurrent deliveries of an email wait this long for the first one's result
+# before getting a 409; a claim untouched for the stale period is taken over.
+# A waiter keeps its ingest admission slot, so this must stay below
+# ADMISSION_INGEST_WAIT_SECONDS or queued requests time out behind it.
+INGEST_CLAIM_WAIT_SECONDS = float(os.environ.get('INGEST_CLAIM_WAIT_SECONDS', '3'))
+INGEST_CLAIM_STALE_SECONDS = float(os.environ.get('INGEST_CLAIM_STALE_SECONDS', '300'))
+
+# Entries in each worker's in-process MRZ parse cache (backed by mrz_parse_results).
+MRZ_CACHE_SIZE = int(os.environ.get('MRZ_CACHE_SIZE', '4096'))
+
+# On-demand profiling (POST /api/v1/profiling or `kill -USR2 <worker pid>`):
+# armed requests under these paths write a collapsed-stack CPU profile, an
+# optional SQL log and an optional tracemalloc snapshot to the output dir.
+PROFILE_OUTPUT_DIR = os.environ.get('PROFILE_OUTPUT_DIR', str(BASE_DIR / 'profiles'))
+PROFILE_PATHS = ['/api/v1/ingest', '/api/v1/simulate-issuance']
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '2'))
+PROFILE_TRACEMALLOC_FRAMES = int(os.environ.get('PROFILE_TRACEMALLOC_FRAMES', '10'))
+PROFILE_SIGNAL_REQUESTS = int(os.environ.get('PROFILE_SIGNAL_REQUESTS', '10'))
+# Sent as X-Profiling-Secret to /api/v1/profiling; empty disables the endpoint.
+PROFILING_ADMIN_SECRET = os.environ.get('PROFILING_ADMIN_SECRET', '')
+
+# Request bodies may be sent with Content-Encoding gzip or zstd; this caps the
+# decoded size (the compressed size is capped by DATA_UPLOAD_MAX_MEMORY_SIZE).
+REQUEST_MAX_DECOMPRESSED_BYTES = int(os.environ.get('REQUEST_MAX_DECOMPRESSED_BYTES', str(32 * 2 ** 20)))
+
+# Content-addressed artifact store for issuance PDFs, screenshots and audits:
+# 'local' (ARTIFACT_LOCAL_DIR) or 'gcs'. Download URLs saved on cases start
+# with ARTIFACT_BASE_URL.
+ARTIFACT_BACKEND = os.environ.get('ARTIFACT_BACKEND', 'local')
+ARTIFACT_LOCAL_DIR = os.environ.get('ARTIFACT_LOCAL_DIR', str(BASE_DIR / 'artifacts'))
+ARTIFACT_GCS_BUCKET = os.environ.get('ARTIFACT_GCS_BUCKET', 'travel-rpa-storage')
+ARTIFACT_GCS_PREFIX = os.environ.get('ARTIFACT_GCS_PREFIX', 'artifacts/')
+ARTIFACT_BASE_URL = os.environ.get('ARTIFACT_BASE_URL', 'http://localhost:8000')
+
+# Admission control for the webhook endpoints (apps.core.admission). Each has
+# its own budget: at most `concurrency` requests run per worker process, up to
+# `queue` more wait `wait_seconds` for a slot; beyond that requests are shed
+# with 429 (queue full) or 503 (wait expired) and Retry-After.
+ADMISSION_CONTROL = os.environ.get('ADMISSION_CONTROL', 'true').lower() == 'true'
+ADMISSION_LIMITS = {
+    'ingest': {
+        'path': '/api/v1/ingest',
+        'concurrency': int(os.environ.get('ADMISSION_INGEST_CONCURRENCY', '4')),
+        'queue': int(os.environ.get('ADMISSION_INGEST_QUEUE', '8')),
+        'wait_seconds': float(os.environ.get('ADMISSION_INGEST_WAIT_SECONDS', '5')),
+        'retry_after': int(os.environ.get('ADMISSION_INGEST_RETRY_AFTER', '5')),
+    },
+    'issuance': {
+        'path': '/api/v1/simulate-issuance',
+        'concurrency': int(os.environ.get('ADMISSION_ISSUANCE_CONCURRENCY', '2')),
+        'queue': int(os.environ.get('ADMISSION_ISSUANCE_QUEUE', '2')),
+        'wait_seconds': float(os.environ.get('ADMISSION_ISSUANCE_WAIT_SECONDS', '2')),
+        'retry_after': int(os.environ.get('ADMISSION_ISSUANCE_RETRY_AFTER', '10')),
+    },
+}
@@ -8,7 +8,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file (not the default shared-cache in-memory database) so the
+        # multi-threaded ingest tests get SQLite's busy-wait locking.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
 N8N_WEBHOOK_SECRET = os.environ.get('N8N_WEBHOOK_SECRET', 'test-secret')
+PROFILING_ADMIN_SECRET = os.environ.get('PROFILING_ADMIN_SECRET', 'test-admin-secret')
@@ -0,0 +1,21 @@
+from .development import *
+
+# Local primary/replica pair on two SQLite files for exercising the router.
+# There is no replication between them: run `migrate --run-syncdb` against
+# both aliases and copy db.sqlite3 over db_replica.sqlite3 to "replicate".
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
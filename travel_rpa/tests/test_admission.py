@@ -0,0 +1,112 @@
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core import admission, metrics
+from apps.core.admission import QUEUE_FULL, TIMED_OUT, AdmissionControlMiddleware, AdmissionGate
+
+
+@pytest.fixture
+def limits(settings):
+    settings.ADMISSION_LIMITS = {
+        'ingest': {'path': '/api/v1/ingest', 'concurrency': 1, 'queue': 1,
+                   'wait_seconds': 5, 'retry_after': 3},
+        'issuance': {'path': '/api/v1/simulate-issuance', 'concurrency': 1, 'queue': 0,
+                     'wait_seconds': 0, 'retry_after': 7},
+    }
+    admission.reset()
+    metrics.reset()
+    yield settings.ADMISSION_LIMITS
+    admission.reset()
+
+
+def test_gate_queues_then_sheds():
+    gate = AdmissionGate('test', concurrency=1, queue=1, wait_seconds=0.05)
+    assert gate.acquire() is None
+    assert gate.acquire() == TIMED_OUT
+
+    outcome = []
+    waiter = threading.Thread(target=lambda: outcome.append(gate.acquire()))
+    waiter.start()
+    while gate.gauges()['admission.test.queued'] == 0:
+        time.sleep(0.001)
+    assert gate.acquire() == QUEUE_FULL
+    gate.release()
+    waiter.join()
+    assert outcome == [None]
+    assert gate.gauges() == {
+        'admission.test.active': 1, 'admission.test.queued': 0, 'admission.test.queued_max': 1
+    }
+
+
+def test_gate_admits_queued_callers_in_arrival_order():
+    gate = AdmissionGate('test', concurrency=1, queue=5, wait_seconds=5)
+    assert gate.acquire() is None
+    order = []
+
+    def wait(i):
+        assert gate.acquire() is None
+        order.append(i)
+        gate.release()
+
+    waiters = []
+    for i in range(5):
+        waiters.append(threading.Thread(target=wait, args=(i,)))
+        waiters[-1].start()
+        while gate.gauges()['admission.test.queued'] < i + 1:
+            time.sleep(0.001)
+    gate.release()
+    for waiter in waiters:
+        waiter.join()
+    assert order == list(range(5))
+
+
+def test_busy_issuance_does_not_block_ingest(limits):
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_view(request):
+        if request.path.endswith('simulate-issuance'):
+            started.set()
+            finish.wait(5)
+        return HttpResponse('ok')
+
+    middleware = AdmissionControlMiddleware(slow_view)
+    factory = RequestFactory()
+    issuing = threading.Thread(target=middleware, args=(factory.post('/api/v1/simulate-issuance'),))
+    issuing.start()
+    started.wait(5)
+
+    shed = middleware(factory.post('/api/v1/simulate-issuance'))
+    assert shed.status_code == 429
+    assert shed['Retry-After'] == '7'
+    assert middleware(factory.post('/api/v1/ingest')).status_code == 200
+    assert middleware(factory.get('/api/v1/stats')).status_code == 200
+
+    finish.set()
+    issuing.join()
+    assert metrics.snapshot()['admission.issuance.shed.queue_full'] == 1
+    assert metrics.snapshot()['admission.ingest.admitted'] == 1
+
+
+@pytest.mark.django_db
+def test_gauges_on_metrics_endpoint(limits):
+    counters = Client().get('/api/v1/metrics', HTTP_X_WEBHOOK_SECRET='test-secret').json()
+    assert counters['admission.ingest.active'] == 0
+    assert counters['admission.issuance.queued'] == 0
+
+
+def test_claim_wait_must_be_shorter_than_admission_wait(limits, settings):
+    assert settings.INGEST_CLAIM_WAIT_SECONDS < limits['ingest']['wait_seconds']
+    settings.INGEST_CLAIM_WAIT_SECONDS = limits['ingest']['wait_seconds']
+    with pytest.raises(ImproperlyConfigured):
+        apps.get_app_config('core').ready()
+    settings.ADMISSION_CONTROL = False
+    apps.get_app_config('core').ready()
@@ -0,0 +1,121 @@
+"""Worst-case latency budgets for code that runs on untrusted email and OCR text.
+
+Each target is called once per generated input and every call must finish
+inside its budget (p100, not an average), so no single email can pin a
+gunicorn thread. The slowest inputs are printed (``pytest -s``) and listed
+in the failure message.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from django.conf import settings
+
+from apps.core.dedup import Fingerprint
+from apps.extraction import fingerprint
+from apps.extraction.policy_extractor import extract_policy_data
+from apps.extraction.mrz_parser import MRZParser
+from apps.extraction.preprocess import trim_email_body
+
+MEGABYTE = 1024 * 1024
+RAW_EXTRACT_BYTES = 64 * 1024
+
+# Seconds per call, deliberately loose for slow CI machines: the failures
+# this guards against are quadratic blow-ups that take minutes, not ms.
+PIPELINE_BUDGET = 0.5
+RAW_EXTRACT_BUDGET = 0.25
+MRZ_BUDGET = 0.5
+
+FRAGMENTS = [
+    '1', '12', '123', ',', '$', ' ', '  ', '\t', '\n', '-', '/', '<', '>', 'P<',
+    'day', 'days', 'week', 'months', 'gold', 'plus', 'silver', 'worldwide',
+    'excluding', 'usa', 'on ', 'wrote:', 'From:', 'Sent:', '-- ', '<br>', '<style',
+    '</style>', '&amp;', 'sports', 'insurance', '2025-', '01/', 'é', ' ',
+]
+
+
+def repeat_to(unit, size=MEGABYTE):
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def adversarial_bodies():
+    bodies = {
+        'digit_run': repeat_to('9'),
+        'digits_then_whitespace': repeat_to('9', MEGABYTE // 2) + repeat_to(' ', MEGABYTE // 2),
+        'digit_groups': repeat_to('1,'),
+        'money_like': repeat_to('$ 1'),
+        'lt_padding': repeat_to('<'),
+        'mrz_padding': 'P<' + repeat_to('<') + '\n' + repeat_to('<'),
+        'nested_whitespace': repeat_to(' \t \n\r\n  '),
+        'plan_prefix_whitespace': repeat_to('gold ' + ' ' * 64),
+        'partial_dates': repeat_to('1/1/'),
+        'partial_iso_dates': repeat_to('2025-1'),
+        'durations_without_unit': repeat_to('12 '),
+        'reply_header_prefix': repeat_to('on and on '),
+        'unclosed_tags': repeat_to('<a'),
+        'unclosed_style': repeat_to('<style'),
+        'quoted_lines': repeat_to('> 2025-01-01 gold 10 days\n'),
+        'outlook_headers': repeat_to('From: x\n'),
+    }
+    rng = random.Random(30)
+    for i in range(8):
+        pieces = []
+        while sum(map(len, pieces)) < MEGABYTE // 4:
+            pieces.append(rng.choice(FRAGMENTS) * rng.choice([1, 1, 2, 16, 256]))
+        bodies[f'random_{i}'] = ''.join(pieces)
+    return bodies
+
+
+BODIES = adversarial_bodies()
+
+
+def ingest_pipeline(body):
+    # The body-dependent work ingest_email does before touching the database.
+    trimmed = trim_email_body(body, settings.EXTRACTION_MAX_SCAN_BYTES)
+    extracted = extract_policy_data(trimmed['text'], '')
+    Fingerprint(trimmed['text'], [], extracted)
+
+
+TARGETS = {
+    'ingest_pipeline': (ingest_pipeline, None, PIPELINE_BUDGET),
+    'extract_policy_data': (lambda body: extract_policy_data(body, ''), RAW_EXTRACT_BYTES, RAW_EXTRACT_BUDGET),
+    'mrz_parse_passport': (MRZParser().parse_passport, None, MRZ_BUDGET),
+}
+
+
+@pytest.mark.parametrize('target', TARGETS)
+def test_worst_case_latency(target):
+    func, max_input, budget = TARGETS[target]
+
+    timings = []
+    for name, body in BODIES.items():
+        if max_input is not None:
+            body = body[:max_input]
+        started = time.perf_counter()
+        func(body)
+        timings.append((time.perf_counter() - started, name, len(body)))
+
+    timings.sort(reverse=True)
+    report = ', '.join(f"{name} ({size} chars) {elapsed * 1000:.1f} ms" for elapsed, name, size in timings[:5])
+    print(f"\n{target} slowest: {report}")
+    assert timings[0][0] <= budget, f"{target} exceeded {budget}s budget; slowest: {report}"
+
+
+def test_fingerprint_does_not_trim_again(monkeypatch):
+    calls = []
+
+    def counting_trim(body, *args, **kwargs):
+        calls.append(len(body))
+        return trim_email_body(body, *args, **kwargs)
+
+    monkeypatch.setattr(fingerprint, 'trim_email_body', counting_trim)
+    trimmed = trim_email_body(BODIES['quoted_lines'], settings.EXTRACTION_MAX_SCAN_BYTES)
+    Fingerprint(trimmed['text'], [])
+    assert calls == []
+    fingerprint.normalize_body('Hello\n-- \nsig')
+    assert len(calls) == 1
@@ -0,0 +1,87 @@
+import pytest
+import gzip
+import json
+import sys
+from pathlib import Path
+from django.test import Client
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core.artifacts import put_artifact, reset_backend
+from apps.core.models import Artifact
+
+AUDIT = json.dumps({'policy_number': 'TP-1', 'lines': ['x' * 40] * 200}).encode()
+
+
+@pytest.fixture
+def store(settings, tmp_path):
+    settings.ARTIFACT_LOCAL_DIR = str(tmp_path)
+    reset_backend()
+    yield tmp_path
+    reset_backend()
+
+
+def download(client, artifact, **headers):
+    return client.get(
+        f"/api/v1/artifacts/{artifact.content_hash}", HTTP_X_WEBHOOK_SECRET='test-secret', **headers
+    )
+
+
+@pytest.mark.django_db
+def test_identical_content_is_stored_once_and_compressed(store):
+    first = put_artifact(AUDIT, 'application/json')
+    second = put_artifact(AUDIT, 'application/json')
+    assert first.pk == second.pk
+    assert Artifact.objects.count() == 1
+    assert first.encoding == 'gzip' and first.stored_size < first.size
+    assert len([p for p in store.rglob('*') if p.is_file()]) == 1
+
+    png = put_artifact(b'\x89PNG' + bytes(range(256)), 'image/png')
+    assert png.encoding == 'identity'
+
+
+@pytest.mark.django_db
+def test_download_full_gzip_and_conditional(store):
+    artifact = put_artifact(AUDIT, 'application/json')
+    client = Client()
+
+    response = download(client, artifact)
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content) == AUDIT
+    assert response['Content-Length'] == str(len(AUDIT))
+    etag = response['ETag']
+
+    encoded = download(client, artifact, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert encoded['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(b''.join(encoded.streaming_content)) == AUDIT
+    for refused in ('gzip;q=0', 'identity, *;q=0', 'br, *;q=0.5, gzip; q=0', 'deflate'):
+        plain = download(client, artifact, HTTP_ACCEPT_ENCODING=refused)
+        assert 'Content-Encoding' not in plain, refused
+        assert b''.join(plain.streaming_content) == AUDIT
+    wildcard = download(client, artifact, HTTP_ACCEPT_ENCODING='br;q=1.0, *;q=0.1')
+    assert wildcard['Content-Encoding'] == 'gzip'
+
+    assert download(client, artifact, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert download(
+        client, artifact, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == 304
+    assert client.get(f"/api/v1/artifacts/{'0' * 64}", HTTP_X_WEBHOOK_SECRET='test-secret').status_code == 404
+    assert client.get(f"/api/v1/artifacts/{artifact.content_hash}").status_code == 401
+
+
+@pytest.mark.django_db
+def test_download_ranges(store):
+    artifact = put_artifact(AUDIT, 'application/json')
+    client = Client()
+
+    partial = download(client, artifact, HTTP_RANGE='bytes=100-199', HTTP_ACCEPT_ENCODING='gzip')
+    assert partial.status_code == 206
+    assert partial['Content-Range'] == f"bytes 100-199/{len(AUDIT)}"
+    assert b''.join(partial.streaming_content) == AUDIT[100:200]
+
+    tail = download(client, artifact, HTTP_RANGE='bytes=-10')
+    assert b''.join(tail.streaming_content) == AUDIT[-10:]
+
+    assert download(client, artifact, HTTP_RANGE=f"bytes={len(AUDIT)}-").status_code == 416
+    stale = download(client, artifact, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"other"')
+    assert stale.status_code == 200
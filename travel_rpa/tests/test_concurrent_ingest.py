@@ -0,0 +1,118 @@
+import pytest
+import json
+import sys
+import threading
+from datetime import timedelta
+from pathlib import Path
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core import ingest as ingest_module
+from apps.core.ingest import PROCESSING_ROUTE, ingest
+from apps.core.models import Case
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+THREADS = 8
+
+
+def load_email(case_name):
+    with open(GOLDEN_DIR / case_name / 'email.json') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def extraction_calls(monkeypatch):
+    calls = []
+    original = ingest_module.extract_policy_data
+
+    def counting(body, subject):
+        calls.append(body)
+        return original(body, subject)
+
+    monkeypatch.setattr(ingest_module, 'extract_policy_data', counting)
+    return calls
+
+
+def run_concurrently(email):
+    barrier = threading.Barrier(THREADS)
+    results = [None] * THREADS
+    errors = []
+
+    def worker(i):
+        try:
+            barrier.wait()
+            results[i] = ingest(dict(email))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_duplicates_are_processed_once(extraction_calls):
+    email = load_email('case_18_outbound_gold_3travellers')
+
+    results, errors = run_concurrently(email)
+
+    assert errors == []
+    assert len(extraction_calls) == 1
+    assert Case.objects.count() == 1
+    statuses = {http_status for _, http_status in results}
+    payloads = {json.dumps(payload, sort_keys=True) for payload, _ in results}
+    assert statuses == {200}
+    assert len(payloads) == 1
+    assert results[0][0]['route'] == 'success'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_owner_releases_claim(monkeypatch):
+    email = load_email('case_06_outbound_silver_10days')
+
+    def boom(body, subject):
+        raise RuntimeError('extraction crashed')
+
+    monkeypatch.setattr(ingest_module, 'extract_policy_data', boom)
+    with pytest.raises(RuntimeError):
+        ingest(dict(email))
+    assert not Case.objects.exists()
+
+    monkeypatch.undo()
+    payload, http_status = ingest(dict(email))
+    assert payload['route'] == 'success'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stale_claim_is_taken_over():
+    email = load_email('case_06_outbound_silver_10days')
+    payload, _ = ingest(dict(email))
+    Case.objects.update(
+        route=PROCESSING_ROUTE, response_json=None,
+        updated_at=timezone.now() - timedelta(hours=1)
+    )
+
+    retried, http_status = ingest(dict(email))
+    assert http_status == 200
+    assert retried['case_id'] == payload['case_id']
+    assert retried['route'] == 'success'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_waiter_gives_up_with_conflict_while_owner_runs():
+    email = load_email('case_06_outbound_silver_10days')
+    ingest(dict(email))
+    Case.objects.update(route=PROCESSING_ROUTE, response_json=None, updated_at=timezone.now())
+
+    with override_settings(INGEST_CLAIM_WAIT_SECONDS=0.1):
+        payload, http_status = ingest(dict(email))
+    assert http_status == 409
+    assert payload['status'] == PROCESSING_ROUTE
@@ -0,0 +1,144 @@
+import pytest
+import json
+import subprocess
+import sys
+from pathlib import Path
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core import metrics
+from apps.core.db_router import (
+    PIN_COOKIE, PrimaryReplicaRouter, ReplicaRoutingMiddleware, replica_reads, reset_routing_state
+)
+from apps.core.models import Case
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+PROJECT_DIR = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setitem(settings.DATABASES, 'replica', {'ENGINE': 'django.db.backends.sqlite3'})
+    reset_routing_state()
+    metrics.reset()
+    yield PrimaryReplicaRouter()
+    reset_routing_state()
+
+
+def test_reads_use_primary_by_default(router):
+    assert router.db_for_read(Case) == 'default'
+
+
+def test_read_only_block_uses_replica(router):
+    with replica_reads():
+        assert router.db_for_read(Case) == 'replica'
+    assert router.db_for_read(Case) == 'default'
+    assert metrics.snapshot() == {'db.reads.replica': 1, 'db.reads.default': 1}
+
+
+def test_reads_stick_to_primary_after_write(router):
+    with replica_reads():
+        assert router.db_for_write(Case) == 'default'
+        assert router.db_for_read(Case) == 'default'
+
+
+def test_middleware_clears_pinning(router):
+    router.db_for_write(Case)
+    middleware = ReplicaRoutingMiddleware(lambda request: None)
+    middleware(RequestFactory().get('/'))
+    with replica_reads():
+        assert router.db_for_read(Case) == 'replica'
+
+
+def test_write_pins_the_client_across_requests(router):
+    def view(request):
+        with replica_reads():
+            if request.method == 'POST':
+                router.db_for_write(Case)
+            return HttpResponse(router.db_for_read(Case))
+
+    middleware = ReplicaRoutingMiddleware(view)
+    factory = RequestFactory()
+
+    written = middleware(factory.post('/'))
+    assert written.content == b'default'
+    assert written.cookies[PIN_COOKIE]['max-age'] == settings.DATABASE_REPLICA_PIN_SECONDS
+
+    follow_up = factory.get('/')
+    follow_up.COOKIES[PIN_COOKIE] = written.cookies[PIN_COOKIE].value
+    assert middleware(follow_up).content == b'default'
+
+    read = middleware(factory.get('/'))
+    assert read.content == b'replica'
+    assert PIN_COOKIE not in read.cookies
+
+
+# Runs against the two SQLite files of config.settings.replica_local (moved
+# to a temp dir). Nothing replicates between them, so a case written through
+# the API exists only on the primary and a 404 proves the read hit the replica.
+REPLICA_LOCAL_PROBE = """
+import json, sys
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = sys.argv[1] + '/db.sqlite3'
+settings.DATABASES['replica']['NAME'] = sys.argv[1] + '/db_replica.sqlite3'
+import django
+django.setup()
+from django.core.management import call_command
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment()
+for alias in ('default', 'replica'):
+    call_command('migrate', database=alias, run_syncdb=True, verbosity=0)
+writer = Client(HTTP_X_WEBHOOK_SECRET='test-secret')
+case = writer.post('/api/v1/ingest', data=open(sys.argv[2]).read(), content_type='application/json').json()
+path = '/api/v1/cases/' + case['case_id']
+print(json.dumps({
+    'writer': writer.get(path).status_code,
+    'other_client': Client(HTTP_X_WEBHOOK_SECRET='test-secret').get(path).status_code,
+    'metrics': writer.get('/api/v1/metrics').json(),
+}))
+"""
+
+
+def test_replica_local_reads_hit_the_expected_alias(tmp_path):
+    result = subprocess.run(
+        [sys.executable, '-c', REPLICA_LOCAL_PROBE, str(tmp_path),
+         str(GOLDEN_DIR / 'case_18_outbound_gold_3travellers' / 'email.json')],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+        env={'DJANGO_SETTINGS_MODULE': 'config.settings.replica_local', 'PATH': ''}
+    )
+    assert result.returncode == 0, result.stderr
+    outcome = json.loads(result.stdout.splitlines()[-1])
+    assert outcome['writer'] == 200
+    assert outcome['other_client'] == 404
+    assert outcome['metrics']['db.reads.replica'] >= 1
+
+
+def test_no_replica_configured(monkeypatch):
+    monkeypatch.delitem(settings.DATABASES, 'replica', raising=False)
+    reset_routing_state()
+    with replica_reads():
+        assert PrimaryReplicaRouter().db_for_read(Case) == 'default'
+
+
+@pytest.mark.django_db
+def test_case_detail_and_metrics_endpoints():
+    with open(GOLDEN_DIR / 'case_18_outbound_gold_3travellers' / 'email.json') as f:
+        email = json.load(f)
+    client = Client()
+    created = client.post(
+        '/api/v1/ingest', data=json.dumps(email), content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    ).json()
+
+    response = client.get(f"/api/v1/cases/{created['case_id']}", HTTP_X_WEBHOOK_SECRET='test-secret')
+    assert response.status_code == 200
+    case = response.json()
+    assert case['route'] == 'success'
+    assert len(case['travellers']) == 3
+
+    counters = client.get('/api/v1/metrics', HTTP_X_WEBHOOK_SECRET='test-secret').json()
+    assert counters['db.reads.default'] > 0
@@ -0,0 +1,50 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+from django.test import Client
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+def post(client, email):
+    return client.post(
+        '/api/v1/ingest',
+        data=json.dumps(email),
+        content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('case_name', [
+    'case_18_outbound_gold_3travellers',
+    'case_24_outbound_missing_plan',
+])
+def test_retry_replays_stored_response(case_name, django_assert_num_queries):
+    with open(GOLDEN_DIR / case_name / 'email.json') as f:
+        email = json.load(f)
+    client = Client()
+    first = post(client, email)
+
+    with django_assert_num_queries(1):
+        retry = post(client, email)
+
+    assert retry.status_code == first.status_code
+    assert retry.json() == first.json()
+
+
+@pytest.mark.django_db
+def test_pricing_error_status_is_replayed():
+    with open(GOLDEN_DIR / 'case_06_outbound_silver_10days' / 'email.json') as f:
+        email = json.load(f)
+    email['body'] = email['body'].replace('10 days', '400 days')
+    client = Client()
+    first = post(client, email)
+    assert first.status_code == 400
+
+    retry = post(client, email)
+    assert retry.status_code == 400
+    assert retry.json() == first.json()
@@ -0,0 +1,113 @@
+import pytest
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core.management.commands.ingest_worker import MAX_CRASHES, recover_stale, scan_incoming
+from apps.core.models import Case
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+@pytest.fixture
+def spool(tmp_path):
+    for name in ('incoming', 'processing', 'done', 'failed'):
+        (tmp_path / name).mkdir()
+    return tmp_path
+
+
+def drop(spool, name, payload):
+    (spool / 'incoming' / name).write_text(json.dumps(payload))
+
+
+def test_scan_groups_by_thread_in_received_order(spool):
+    drop(spool, 'b.json', {'message_id': 'm2', 'thread_id': 't1', 'received_at': '2025-10-02T00:00:00Z'})
+    drop(spool, 'a.json', {'message_id': 'm1', 'thread_id': 't1', 'received_at': '2025-10-03T00:00:00Z'})
+    drop(spool, 'c.json', {'message_id': 'm3', 'thread_id': 't2'})
+    drop(spool, 'd.json', {'message_id': 'm4', 'thread_id': 'busy'})
+
+    claim_dir = spool / 'processing' / 'host-1'
+    claim_dir.mkdir()
+    groups = scan_incoming(spool, claim_dir, busy_threads={'busy'})
+    assert groups == {'t1': ['b.json', 'a.json'], 't2': ['c.json']}
+    assert sorted(p.name for p in claim_dir.iterdir()) == ['a.json', 'b.json', 'c.json']
+    assert [p.name for p in (spool / 'incoming').iterdir()] == ['d.json']
+
+
+@pytest.mark.django_db
+def test_worker_ingests_spool_inline(spool):
+    shutil.copy(GOLDEN_DIR / 'case_06_outbound_silver_10days' / 'email.json', spool / 'incoming' / 'case_06.json')
+    shutil.copy(GOLDEN_DIR / 'case_24_outbound_missing_plan' / 'email.json', spool / 'incoming' / 'case_24.json')
+    (spool / 'incoming' / 'broken.json').write_text('{not json')
+
+    call_command('ingest_worker', spool_dir=str(spool), workers=0, once=True, stdout=StringIO())
+
+    assert sorted(p.name for p in (spool / 'done').iterdir()) == [
+        'case_06.json', 'case_06.result.json', 'case_24.json', 'case_24.result.json'
+    ]
+    assert sorted(p.name for p in (spool / 'failed').iterdir()) == ['broken.json', 'broken.result.json']
+    assert not list((spool / 'incoming').iterdir())
+
+    result = json.loads((spool / 'done' / 'case_06.result.json').read_text())
+    assert result['status'] == 200
+    assert result['response']['route'] == 'success'
+    assert json.loads((spool / 'done' / 'case_24.result.json').read_text())['response']['route'] == 'missing'
+    assert Case.objects.count() == 2
+
+
+def test_recovers_only_claims_of_dead_instances(spool):
+    finished = subprocess.Popen(['true'])
+    finished.wait()
+    dead = spool / 'processing' / f"{socket.gethostname()}-{finished.pid}"
+    live = spool / 'processing' / f"{socket.gethostname()}-{os.getpid()}"
+    remote = spool / 'processing' / 'otherhost-42'
+    for claim_dir, name in ((dead, 'dead.json'), (live, 'live.json'), (remote, 'remote.json')):
+        claim_dir.mkdir()
+        (claim_dir / name).write_text('{}')
+
+    assert recover_stale(spool, stale_seconds=300) == ['dead.json']
+    assert not dead.exists()
+    assert (live / 'live.json').exists()
+
+    os.utime(remote, (0, 0))
+    assert recover_stale(spool, stale_seconds=300) == ['remote.json']
+    assert sorted(p.name for p in (spool / 'incoming').iterdir()) == ['dead.json', 'remote.json']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_ingests_spool_with_process_pool(spool):
+    shutil.copy(GOLDEN_DIR / 'case_06_outbound_silver_10days' / 'email.json', spool / 'incoming' / 'case_06.json')
+    shutil.copy(GOLDEN_DIR / 'case_24_outbound_missing_plan' / 'email.json', spool / 'incoming' / 'case_24.json')
+
+    call_command('ingest_worker', spool_dir=str(spool), workers=2, once=True, stdout=StringIO())
+
+    assert sorted(p.name for p in (spool / 'done').iterdir()) == [
+        'case_06.json', 'case_06.result.json', 'case_24.json', 'case_24.result.json'
+    ]
+    assert not list((spool / 'processing').iterdir())
+    assert Case.objects.count() == 2
+
+
+def _crash_on(data):
+    os._exit(1)
+
+
+def test_worker_crash_restarts_pool_and_fails_the_file(spool, monkeypatch):
+    monkeypatch.setattr('apps.core.ingest.ingest', _crash_on)
+    drop(spool, 'poison.json', {'message_id': 'poison', 'thread_id': 'poison'})
+
+    err = StringIO()
+    call_command('ingest_worker', spool_dir=str(spool), workers=1, once=True, stdout=StringIO(), stderr=err)
+
+    assert err.getvalue().count('restarting the pool') == MAX_CRASHES
+    result = json.loads((spool / 'failed' / 'poison.result.json').read_text())
+    assert f"died {MAX_CRASHES} times" in result['error']
+    assert not list((spool / 'incoming').iterdir())
@@ -0,0 +1,144 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+import requests
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client, override_settings
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core.artifacts import reset_backend
+from apps.core.models import Case
+from apps.issuance.drivers import IssuanceDriver, IssuanceNotConfigured, IssuanceUnavailable, get_driver
+from apps.issuance.http_driver import HTTPIssuanceDriver
+from apps.issuance.mock_portal import serve_in_background
+from apps.issuance.simulator import PlaywrightSimulator
+
+
+@pytest.fixture
+def portal_url():
+    server, url = serve_in_background()
+    yield url
+    server.shutdown()
+
+
+def test_http_driver_issues_policy(portal_url):
+    driver = HTTPIssuanceDriver(portal_url)
+    result = driver.simulate_issuance({
+        'case_id': 'abcdef12-3456', 'plan': 'Gold', 'scope': 'WORLDWIDE', 'days': 14
+    })
+    assert result['simulated_policy_number'] == 'TP-ABCDEF12'
+    assert result['policy_pdf'].startswith(b'%PDF')
+    assert result['screenshot_png'] is None
+
+
+def test_browser_only_used_for_screenshots(portal_url):
+    with override_settings(ISSUANCE_DRIVER='http', ISSUANCE_PORTAL_URL=portal_url):
+        assert isinstance(get_driver(), HTTPIssuanceDriver)
+        assert get_driver() is get_driver()
+        assert isinstance(get_driver(screenshot=True), PlaywrightSimulator)
+    with override_settings(ISSUANCE_DRIVER='playwright', ISSUANCE_PORTAL_URL=portal_url):
+        assert isinstance(get_driver(), PlaywrightSimulator)
+
+
+@pytest.mark.django_db
+def test_simulate_issuance_endpoint_uses_http_driver(portal_url, settings, tmp_path):
+    settings.ARTIFACT_LOCAL_DIR = str(tmp_path)
+    reset_backend()
+    case = Case.objects.create(
+        message_id='msg-issue-1', thread_id='thread-issue-1', idempotency_key='k' * 64,
+        from_email='client@example.com', subject='s', body='b',
+        received_at='2025-10-01T10:00:00Z', plan='Gold', scope='WORLDWIDE', days=14,
+        route='success'
+    )
+    with override_settings(ISSUANCE_DRIVER='http', ISSUANCE_PORTAL_URL=portal_url):
+        response = Client().post(
+            '/api/v1/simulate-issuance',
+            data=json.dumps({'case_id': str(case.case_id)}),
+            content_type='application/json',
+            HTTP_X_WEBHOOK_SECRET='test-secret'
+        )
+    assert response.status_code == 200
+    data = response.json()
+    assert data['policy_number'] == f"TP-{str(case.case_id)[:8].upper()}"
+    assert data['screenshot_url'] is None
+    case.refresh_from_db()
+    assert case.policy_pdf_url == data['policy_pdf_url']
+    assert case.audit_json_url == data['audit_json_url']
+    reset_backend()
+
+
+@pytest.mark.django_db
+def test_issuance_needs_a_portal():
+    with pytest.raises(TypeError):
+        IssuanceDriver()
+    for driver in ('http', 'playwright'):
+        with override_settings(ISSUANCE_DRIVER=driver, ISSUANCE_PORTAL_URL=''):
+            with pytest.raises(IssuanceNotConfigured):
+                get_driver()
+            with pytest.raises(IssuanceNotConfigured):
+                get_driver(screenshot=True)
+    with override_settings(ISSUANCE_DRIVER='selenium', ISSUANCE_PORTAL_URL='http://portal'):
+        with pytest.raises(ImproperlyConfigured):
+            get_driver()
+
+    case = Case.objects.create(
+        message_id='msg-issue-3', thread_id='thread-issue-3', idempotency_key='m' * 64,
+        from_email='client@example.com', subject='s', body='b',
+        received_at='2025-10-01T10:00:00Z', plan='Gold', scope='WORLDWIDE', days=14,
+        route='success'
+    )
+    with override_settings(ISSUANCE_PORTAL_URL=''):
+        response = Client().post(
+            '/api/v1/simulate-issuance',
+            data=json.dumps({'case_id': str(case.case_id)}),
+            content_type='application/json',
+            HTTP_X_WEBHOOK_SECRET='test-secret'
+        )
+    assert response.status_code == 503
+    assert 'ISSUANCE_PORTAL_URL' in response.json()['error']
+
+
+@pytest.mark.django_db
+def test_unknown_case_is_a_404():
+    response = Client().post(
+        '/api/v1/simulate-issuance',
+        data=json.dumps({'case_id': '00000000-0000-0000-0000-000000000000'}),
+        content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    )
+    assert response.status_code == 404
+
+
+def test_mock_portal_serves_browser_form(portal_url):
+    assert 'name="case_id"' in requests.get(f"{portal_url}/policies/new").text
+    page = requests.post(
+        f"{portal_url}/policies", data={'case_id': 'abcdef12-3456'}, headers={'Accept': 'text/html'}
+    ).text
+    assert '<dd id="policy-number">TP-ABCDEF12</dd>' in page
+
+
+@pytest.mark.django_db
+def test_unreachable_portal_is_a_503():
+    server, url = serve_in_background()
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(IssuanceUnavailable):
+        HTTPIssuanceDriver(url, timeout=1).simulate_issuance({'case_id': 'x'})
+
+    case = Case.objects.create(
+        message_id='msg-issue-2', thread_id='thread-issue-2', idempotency_key='j' * 64,
+        from_email='client@example.com', subject='s', body='b',
+        received_at='2025-10-01T10:00:00Z', plan='Gold', scope='WORLDWIDE', days=14,
+        route='success'
+    )
+    with override_settings(ISSUANCE_DRIVER='http', ISSUANCE_PORTAL_URL=url):
+        response = Client().post(
+            '/api/v1/simulate-issuance',
+            data=json.dumps({'case_id': str(case.case_id)}),
+            content_type='application/json',
+            HTTP_X_WEBHOOK_SECRET='test-secret'
+        )
+    assert response.status_code == 503
+    assert response['Retry-After'] == '30'
@@ -0,0 +1,108 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+from django.test import Client
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core import passports
+from apps.core.models import MRZParseResult, Traveller
+from apps.extraction.mrz_cache import MRZParseCache, mrz_content_hash
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+ERIK = "P<SWEANDERSON<<ERIK<<<<<<<<<<<<<<<<<<<<<<<<\nWX1234567<SWE8001015M2512015<<<<<<<<<<<<<<06"
+
+
+class CountingParser:
+    def __init__(self):
+        self.calls = 0
+
+    def parse_passport(self, ocr_text):
+        self.calls += 1
+        return {'passport_number': ocr_text[:3], 'full_name': 'X', 'date_of_birth': None}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    passports.get_mrz_cache().clear()
+    yield
+    passports.get_mrz_cache().clear()
+
+
+def test_lru_hits_and_eviction():
+    parser = CountingParser()
+    cache = MRZParseCache(maxsize=2, parser=parser)
+    cache.parse('AAA')
+    cache.parse(' aaa \n')  # same content hash
+    cache.parse('BBB')
+    cache.parse('CCC')  # evicts AAA
+    cache.parse('AAA')
+    assert parser.calls == 4
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert mrz_content_hash('AAA') == mrz_content_hash(' aaa ')
+
+
+@pytest.mark.django_db
+def test_database_store_shares_parses_between_caches():
+    content_hash, parsed = passports.parse_passport(ERIK)
+    assert parsed['passport_number'] == 'WX1234567'
+    assert MRZParseResult.objects.get(content_hash=content_hash).result == parsed
+
+    parser = CountingParser()
+    other_worker = MRZParseCache(store=passports.DatabaseMRZStore(), parser=parser)
+    assert other_worker.parse(ERIK) == (content_hash, parsed)
+    assert parser.calls == 0
+
+
+@pytest.mark.django_db
+def test_travellers_reference_shared_parse_and_lookup_endpoint():
+    with open(GOLDEN_DIR / 'case_18_outbound_gold_3travellers' / 'email.json') as f:
+        email = json.load(f)
+    client = Client()
+    created = client.post(
+        '/api/v1/ingest', data=json.dumps(email), content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    ).json()
+
+    erik = Traveller.objects.get(passport_number='WX1234567')
+    assert erik.mrz_data is None
+    assert erik.mrz['full_name'] == erik.full_name
+
+    response = client.get('/api/v1/travellers/wx1234567', HTTP_X_WEBHOOK_SECRET='test-secret')
+    assert response.status_code == 200
+    assert response.json() == {
+        'passport_number': 'WX1234567',
+        'full_name': erik.full_name,
+        'date_of_birth': '1980-01-01',
+        'last_case_id': created['case_id']
+    }
+    assert client.get(
+        '/api/v1/travellers/ZZ0000000', HTTP_X_WEBHOOK_SECRET='test-secret'
+    ).status_code == 404
+
+    unreadable = {'passport_number': 'WX1234567', 'full_name': '', 'date_of_birth': None}
+    filled = passports.fill_from_previous(unreadable)
+    assert filled['full_name'] == erik.full_name
+    assert filled['date_of_birth'] == '1980-01-01'
+    assert unreadable['full_name'] == ''
+
+
+@pytest.mark.django_db
+def test_case_detail_loads_every_mrz_parse_in_one_query(django_assert_num_queries):
+    client = Client()
+    case_ids = []
+    for name in ('case_22_outbound_gold_2travellers', 'case_18_outbound_gold_3travellers'):
+        with open(GOLDEN_DIR / name / 'email.json') as f:
+            case_ids.append(client.post(
+                '/api/v1/ingest', data=f.read(), content_type='application/json',
+                HTTP_X_WEBHOOK_SECRET='test-secret'
+            ).json()['case_id'])
+
+    # Case, then travellers joined to their parses, whatever the traveller count.
+    for case_id in case_ids:
+        with django_assert_num_queries(2):
+            travellers = client.get(
+                f"/api/v1/cases/{case_id}", HTTP_X_WEBHOOK_SECRET='test-secret'
+            ).json()['travellers']
+        assert travellers and all(t['mrz']['passport_number'] == t['passport_number'] for t in travellers)
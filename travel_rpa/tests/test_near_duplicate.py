@@ -0,0 +1,133 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client
+from django.utils import timezone
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core.models import Case, EmailFingerprint
+from apps.extraction.fingerprint import (
+    facts_key, hamming_distance, normalize_body, simhash, simhash_bands
+)
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+def load_email(case_name):
+    with open(GOLDEN_DIR / case_name / 'email.json') as f:
+        return json.load(f)
+
+
+def post(client, email):
+    return client.post(
+        '/api/v1/ingest',
+        data=json.dumps(email),
+        content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    ).json()
+
+
+def test_signature_and_quoting_do_not_move_fingerprint():
+    body = load_email('case_18_outbound_gold_3travellers')['body']
+    forwarded = (
+        "---------- Forwarded message ---------\nFrom: customer@example.com\n"
+        + body + "\n-- \nJane Doe\nSenior Broker\n+961 1 234 567"
+    )
+    assert normalize_body(forwarded) == normalize_body(body)
+    assert hamming_distance(simhash(normalize_body(body)), simhash(normalize_body(forwarded))) == 0
+
+
+def test_unrelated_bodies_are_far_apart():
+    a = simhash(normalize_body(load_email('case_18_outbound_gold_3travellers')['body']))
+    b = simhash(normalize_body(load_email('case_06_outbound_silver_10days')['body']))
+    assert hamming_distance(a, b) > 3
+
+
+def test_bands_cover_whole_fingerprint():
+    fingerprint = simhash('outbound worldwide gold cover for three travellers')
+    bands = simhash_bands(fingerprint)
+    assert sum(band << (16 * i) for i, band in enumerate(bands)) == fingerprint
+
+
+def test_facts_key_depends_on_dates_and_passports():
+    body = 'Please cover from 2025-12-01 to 2026-03-01.'
+    assert facts_key(body, ['AB1']) == facts_key(body + '\nThanks!', ['ab1'])
+    assert facts_key(body, ['AB1']) != facts_key(body, ['AB2'])
+    assert facts_key(body, ['AB1']) != facts_key(body.replace('2025-12-01', '2025-12-02'), ['AB1'])
+    assert facts_key(body, ['AB1'], {'plan': 'Silver'}) != facts_key(body, ['AB1'], {'plan': 'Gold'})
+
+
+def test_max_distance_is_validated_at_startup(settings):
+    settings.NEAR_DUPLICATE_MAX_DISTANCE = 4
+    with pytest.raises(ImproperlyConfigured):
+        apps.get_app_config('core').ready()
+
+
+@pytest.mark.django_db
+def test_resent_email_is_linked_to_existing_case():
+    client = Client()
+    email = load_email('case_18_outbound_gold_3travellers')
+    first = post(client, email)
+    assert first['route'] == 'success'
+
+    resent = dict(email, message_id='test-msg-018-resend',
+                  body=email['body'] + '\n-- \nSent from my phone')
+    second = post(client, resent)
+    assert second['status'] == 'duplicate'
+    assert second['near_duplicate'] is True
+    assert second['case_id'] == first['case_id']
+    assert second['route'] == 'success'
+    assert second['result'] == first
+
+    # A retry of the resend replays the stored reply and is not re-fingerprinted.
+    assert post(client, resent) == second
+    assert Case.objects.get(message_id='test-msg-018-resend').route == 'duplicate'
+    assert EmailFingerprint.objects.filter(case_id=first['case_id']).count() == 2
+
+
+@pytest.mark.django_db
+def test_same_text_for_other_travellers_is_a_new_case():
+    client = Client()
+    email = load_email('case_18_outbound_gold_3travellers')
+    first = post(client, email)
+
+    other = dict(email, message_id='test-msg-018-other', ocr_results=email['ocr_results'][:2])
+    second = post(client, other)
+    assert second['route'] == 'success'
+    assert second['case_id'] != first['case_id']
+
+
+@pytest.mark.django_db
+def test_resend_with_another_plan_is_a_new_case():
+    client = Client()
+    email = load_email('case_06_outbound_silver_10days')
+    first = post(client, email)
+    assert first['route'] == 'success'
+
+    changed = dict(email, message_id='test-msg-006-gold', body=email['body'] + '\nPlan: Gold.')
+    body = normalize_body(changed['body'])
+    assert hamming_distance(simhash(normalize_body(email['body'])), simhash(body)) <= 3
+    second = post(client, changed)
+    assert 'near_duplicate' not in second
+    assert second['case_id'] != first['case_id']
+    assert second['extracted']['plan'] == 'Gold'
+
+
+@pytest.mark.django_db
+def test_case_still_processing_is_not_a_near_duplicate_candidate():
+    client = Client()
+    email = load_email('case_18_outbound_gold_3travellers')
+    first = post(client, email)
+    Case.objects.filter(case_id=first['case_id']).update(
+        route='processing', response_json=None, updated_at=timezone.now()
+    )
+
+    resent = dict(email, message_id='test-msg-018-resend',
+                  body=email['body'] + '\n-- \nSent from my phone')
+    second = post(client, resent)
+    assert 'near_duplicate' not in second
+    assert second['case_id'] != first['case_id']
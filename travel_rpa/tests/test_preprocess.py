@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.extraction.policy_extractor import extract_policy_data
+from apps.extraction.preprocess import trim_email_body
+
+
+REQUEST = (
+    "Please issue an outbound worldwide policy, Gold plan, "
+    "from 2026-01-10 to 2026-01-24 (15 days)."
+)
+
+
+def test_quoted_history_is_ignored_by_extraction():
+    body = REQUEST + (
+        "\n\nOn Mon, 5 Jan 2026 at 09:00, Broker <broker@example.com> wrote:\n"
+        "> Silver plan from 2025-03-01 to 2025-03-20 (20 days)?\n"
+    )
+    trimmed = trim_email_body(body)
+    assert trimmed['reply_cut'] is True
+    assert trimmed['removed_chars'] > 0
+
+    extracted = extract_policy_data(trimmed['text'], '')
+    assert extracted['plan'] == 'Gold'
+    assert extracted['days'] == 15
+    assert extracted['start_date'] == '2026-01-10'
+
+
+def test_wrapped_reply_header_and_outlook_header():
+    gmail = REQUEST + "\n\nOn Mon, 5 Jan 2026 at 09:00, Broker\n<broker@example.com> wrote:\n> old"
+    outlook = REQUEST + "\n\nFrom: Broker\nSent: Monday\nTo: us\nSubject: old\n\nold request"
+    assert trim_email_body(gmail)['text'] == REQUEST
+    assert trim_email_body(outlook)['text'] == REQUEST
+
+
+def test_forwarded_request_is_kept_without_headers():
+    body = (
+        "FYI\n\n---------- Forwarded message ---------\nFrom: Client <c@example.com>\n"
+        "Date: Mon, 5 Jan 2026\nSubject: Policy\n\n" + REQUEST
+    )
+    assert trim_email_body(body)['text'].split() == ("FYI " + REQUEST).split()
+
+
+def test_signature_and_html_removed():
+    body = "<html><style>p {color: red}</style><p>" + REQUEST + "</p><br>Thanks</html>\n-- \nJane +961 1 234 567"
+    trimmed = trim_email_body(body)
+    assert trimmed['text'].split() == (REQUEST + " Thanks").split()
+    assert trimmed['html_removed_chars'] > 0
+
+
+def test_bare_reply_falls_back_to_quoted_request():
+    body = "\n> " + REQUEST + "\n"
+    assert trim_email_body(body)['text'] == REQUEST
+
+
+def test_scanned_bytes_are_capped():
+    body = REQUEST + "\n" + "x" * 1_000_000
+    trimmed = trim_email_body(body, max_bytes=4096)
+    assert trimmed['truncated'] is True
+    assert len(trimmed['text'].encode()) <= 4096
+    assert trimmed['original_chars'] == len(body)
@@ -0,0 +1,73 @@
+import pytest
+import json
+import os
+import sys
+from pathlib import Path
+from django.test import Client
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core import profiling
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_OUTPUT_DIR = str(tmp_path)
+    profiling.disarm()
+    yield tmp_path
+    profiling.disarm()
+
+
+def test_disarmed_block_is_not_profiled(profile_dir):
+    with profiling.maybe_profile('noop') as base:
+        assert base is None
+    assert list(profile_dir.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_armed_ingest_writes_profile_sql_and_allocations(profile_dir):
+    with open(GOLDEN_DIR / 'case_18_outbound_gold_3travellers' / 'email.json') as f:
+        email = json.load(f)
+    client = Client()
+
+    armed = client.post(
+        '/api/v1/profiling', data=json.dumps({'requests': 1, 'sql': True, 'memory': True}),
+        content_type='application/json', HTTP_X_PROFILING_SECRET='test-admin-secret'
+    ).json()
+    assert armed['remaining'] == 1
+    assert armed['pid'] == os.getpid()
+
+    response = client.post(
+        '/api/v1/ingest', data=json.dumps(email), content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    )
+    base = profile_dir / response['X-Profile']
+    summary = json.loads(base.with_name(base.name + '.json').read_text())
+    assert summary['label'] == 'api-v1-ingest'
+    assert summary['query_count'] > 0
+    assert all(q['ms'] >= 0 for q in summary['queries'])
+    assert os.path.exists(summary['tracemalloc'])
+    for line in Path(summary['folded']).read_text().splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0 and stack
+
+    # Only the armed request was captured.
+    again = client.post(
+        '/api/v1/ingest', data=json.dumps(email), content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    )
+    assert 'X-Profile' not in again
+    assert profiling.status()['remaining'] == 0
+
+
+def test_profiling_control_needs_the_admin_secret(profile_dir, settings):
+    client = Client()
+    response = client.post('/api/v1/profiling', HTTP_X_WEBHOOK_SECRET='test-secret')
+    assert response.status_code == 401
+
+    settings.PROFILING_ADMIN_SECRET = ''
+    response = client.post('/api/v1/profiling', HTTP_X_PROFILING_SECRET='')
+    assert response.status_code == 403
+    assert profiling.status()['remaining'] == 0
@@ -0,0 +1,104 @@
+import pytest
+import csv
+import json
+import sys
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+import yaml
+from django.core.management import CommandError, call_command
+from django.test import Client
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core.models import Case
+from apps.pricing.repricing import reprice_chunk
+from apps.pricing.tariff_loader import RULES_PATH, TARIFFS_PATH
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+@pytest.fixture
+def priced_cases():
+    client = Client()
+    for name in ('case_18_outbound_gold_3travellers', 'case_22_outbound_gold_2travellers'):
+        with open(GOLDEN_DIR / name / 'email.json') as f:
+            client.post(
+                '/api/v1/ingest', data=f.read(), content_type='application/json',
+                HTTP_X_WEBHOOK_SECRET='test-secret'
+            )
+    return {c.case_id: c.premium_total for c in Case.objects.filter(route='success')}
+
+
+@pytest.fixture
+def candidate(tmp_path):
+    """The live sheet with every premium raised by 10%."""
+    path = tmp_path / 'tariffs.csv'
+    with open(TARIFFS_PATH) as src, open(path, 'w', newline='') as dst:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(dst, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        for row in reader:
+            row['premium_usd'] = str(Decimal(row['premium_usd']) * Decimal('1.1'))
+            writer.writerow(row)
+    return path
+
+
+def reprice(tmp_path, tariffs, workers, rules=RULES_PATH):
+    out = StringIO()
+    call_command(
+        'reprice', tariffs=str(tariffs), rules=str(rules), since='2025-01-01', until='2026-12-31',
+        output=str(tmp_path / 'deltas.csv'), workers=workers, chunk_size=1, json=True, stdout=out
+    )
+    with open(tmp_path / 'deltas.csv') as f:
+        return json.loads(out.getvalue()), list(csv.DictReader(f))
+
+
+@pytest.mark.django_db
+def test_live_sheet_reprices_to_zero_delta(priced_cases, tmp_path):
+    report, rows = reprice(tmp_path, TARIFFS_PATH, workers=0)
+    assert report['totals']['cases'] == len(priced_cases) == 2
+    assert report['totals']['delta'] == '0.00'
+    assert all(Decimal(row['delta']) == 0 for row in rows)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('workers', [0, 2])
+def test_candidate_sheet_deltas_without_touching_cases(priced_cases, candidate, tmp_path, workers):
+    report, rows = reprice(tmp_path, candidate, workers=workers)
+    assert [row['case_id'] for row in rows] == [
+        str(c) for c in Case.objects.filter(route='success').order_by('received_at', 'case_id')
+        .values_list('case_id', flat=True)
+    ]
+    assert all(Decimal(row['delta']) > 0 for row in rows)
+    assert Decimal(report['totals']['candidate_total']) > Decimal(report['totals']['stored_total'])
+    assert {c.case_id: c.premium_total for c in Case.objects.filter(route='success')} == priced_cases
+
+
+def write_rules(tmp_path, edit):
+    with open(RULES_PATH) as f:
+        rules = yaml.safe_load(f)
+    edit(rules)
+    path = tmp_path / 'rules.yml'
+    path.write_text(yaml.safe_dump(rules))
+    return path
+
+
+@pytest.mark.django_db
+def test_candidate_rules_missing_keys_are_rejected_up_front(tmp_path):
+    rules = write_rules(tmp_path, lambda r: r.pop('fees'))
+    with pytest.raises(CommandError, match="missing section 'fees'"):
+        reprice(tmp_path, TARIFFS_PATH, workers=2, rules=rules)
+    assert not (tmp_path / 'deltas.csv').exists()
+
+
+def test_case_that_fails_to_price_is_counted_not_fatal():
+    # A traveller without a date of birth has no age; pricing raises TypeError.
+    results = reprice_chunk(str(TARIFFS_PATH), str(RULES_PATH), [
+        ('a', '2026-01-01', 'WW_EXCL_US_CA', 'Silver', 5, False, Decimal('18'), [30]),
+        ('b', '2026-01-01', 'WW_EXCL_US_CA', 'Silver', 5, False, Decimal('18'), [30, None]),
+        ('c', '2026-01-01', 'WW_EXCL_US_CA', 'Silver', 500, False, Decimal('18'), [30]),
+    ])
+    assert [r['delta'] for r in results] == [Decimal('0'), None, None]
+    assert results[1]['error'].startswith('TypeError')
+    assert results[2]['error'].startswith('Invalid days')
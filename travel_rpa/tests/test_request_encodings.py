@@ -0,0 +1,70 @@
+import pytest
+import gzip
+import json
+import sys
+from pathlib import Path
+import msgpack
+import zstandard
+from django.test import Client
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core.compression import DecompressionError, decompress
+from apps.core.models import Case
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+def load_email():
+    with open(GOLDEN_DIR / 'case_18_outbound_gold_3travellers' / 'email.json') as f:
+        return json.load(f)
+
+
+def post(client, data, content_type='application/json', **headers):
+    return client.post(
+        '/api/v1/ingest', data=data, content_type=content_type,
+        HTTP_X_WEBHOOK_SECRET='test-secret', **headers
+    )
+
+
+@pytest.mark.django_db
+def test_gzip_json_body():
+    response = post(Client(), gzip.compress(json.dumps(load_email()).encode()),
+                    HTTP_CONTENT_ENCODING='gzip')
+    assert response.status_code == 200
+    assert response.json()['route'] == 'success'
+
+
+@pytest.mark.django_db
+def test_zstd_msgpack_body_and_msgpack_response():
+    data = zstandard.ZstdCompressor().compress(msgpack.packb(load_email()))
+    response = post(Client(), data, content_type='application/msgpack',
+                    HTTP_CONTENT_ENCODING='zstd', HTTP_ACCEPT='application/msgpack')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/msgpack'
+    result = msgpack.unpackb(response.content)
+    assert result['route'] == 'success'
+    assert Case.objects.get(case_id=result['case_id']).travellers.count() == 3
+
+
+@pytest.mark.django_db
+def test_decompressed_size_is_capped(settings):
+    settings.REQUEST_MAX_DECOMPRESSED_BYTES = 64 * 1024
+    bomb = gzip.compress(json.dumps({'body': 'a' * (1024 * 1024)}).encode())
+    assert len(bomb) < 4096
+    response = post(Client(), bomb, HTTP_CONTENT_ENCODING='gzip')
+    assert response.status_code == 413
+    assert not Case.objects.exists()
+
+
+def test_bad_encodings():
+    client = Client()
+    assert post(client, b'not gzip', HTTP_CONTENT_ENCODING='gzip').status_code == 400
+    assert post(client, gzip.compress(b'{}')[:-8], HTTP_CONTENT_ENCODING='gzip').status_code == 400
+    assert post(client, b'{}', HTTP_CONTENT_ENCODING='br').status_code == 415
+
+    frame = zstandard.ZstdCompressor().compress(json.dumps(load_email()).encode())
+    assert post(client, frame[:-4], HTTP_CONTENT_ENCODING='zstd').status_code == 400
+    with pytest.raises(DecompressionError, match='Truncated') as excinfo:
+        decompress(frame[:-4], 'zstd', 1024 * 1024)
+    assert excinfo.value.status == 400
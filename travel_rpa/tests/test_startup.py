@@ -0,0 +1,50 @@
+import pytest
+import json
+import subprocess
+import sys
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.pricing.engine import PricingEngine
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+
+def test_tariffs_loaded_once_per_process():
+    first = PricingEngine()
+    second = PricingEngine()
+    assert first.tariffs is second.tariffs
+    assert first.rules is second.rules
+
+
+def test_views_do_not_import_playwright():
+    probe = (
+        "import sys, django; django.setup(); import apps.core.views; "
+        "print('apps.issuance.simulator' in sys.modules, 'playwright' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', probe],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+        env={'DJANGO_SETTINGS_MODULE': 'config.settings.development', 'PATH': ''}
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['False', 'False']
+
+
+def test_startup_profile_reports_each_module():
+    out = StringIO()
+    call_command('startup_profile', 'apps.pricing.engine', 'not_a_real_module', json=True, stdout=out)
+    engine, missing = json.loads(out.getvalue())
+    assert engine['module'] == 'apps.pricing.engine'
+    assert engine['error'] is None
+    assert engine['import_ms'] >= 0 and engine['baseline_rss_bytes'] > 0
+    assert missing['module'] == 'not_a_real_module'
+    assert 'ModuleNotFoundError' in missing['error']
+
+
+@pytest.mark.django_db
+def test_models_have_migrations():
+    call_command('makemigrations', 'core', check=True, dry_run=True, stdout=StringIO())
@@ -0,0 +1,126 @@
+import pytest
+import json
+import sys
+import threading
+from io import StringIO
+from pathlib import Path
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.core import stats
+from apps.core.models import DailyStats
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+def ingest(client, case_name):
+    with open(GOLDEN_DIR / case_name / 'email.json') as f:
+        email = json.load(f)
+    return client.post(
+        '/api/v1/ingest', data=json.dumps(email), content_type='application/json',
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    ).json()
+
+
+@pytest.mark.django_db
+def test_ingest_updates_buckets_and_endpoint_reads_them():
+    client = Client()
+    for name in ('case_18_outbound_gold_3travellers', 'case_22_outbound_gold_2travellers',
+                 'case_24_outbound_missing_plan'):
+        ingest(client, name)
+    ingest(client, 'case_18_outbound_gold_3travellers')  # replayed, not counted twice
+
+    response = client.get(
+        '/api/v1/stats', {'from': '2025-01-01', 'to': '2026-12-31'},
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data['totals']['cases'] == 3
+    success = [b for b in data['buckets'] if b['route'] == 'success']
+    assert sum(b['cases'] for b in success) == 2
+    assert all(b['plan'] == 'Gold' for b in success)
+
+    call_command('rebuild_stats', check=True, stdout=StringIO())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query, message', [
+    ({'to': '2026-13-01'}, "'to' must be a valid"),
+    ({'from': 'yesterday'}, "'from' must be a valid"),
+    ({'from': '2026-02-01', 'to': '2026-01-01'}, "'from' must not be after 'to'"),
+])
+def test_stats_rejects_bad_date_ranges(query, message):
+    response = Client().get('/api/v1/stats', query, HTTP_X_WEBHOOK_SECRET='test-secret')
+    assert response.status_code == 400
+    assert message in response.json()['error']
+
+
+@pytest.mark.django_db
+def test_rebuild_fixes_drift():
+    client = Client()
+    ingest(client, 'case_18_outbound_gold_3travellers')
+    DailyStats.objects.update(case_count=7)
+
+    with pytest.raises(CommandError):
+        call_command('rebuild_stats', check=True, stdout=StringIO())
+
+    call_command('rebuild_stats', stdout=StringIO())
+    assert DailyStats.objects.get().case_count == 1
+    call_command('rebuild_stats', check=True, stdout=StringIO())
+
+
+@pytest.mark.django_db
+def test_rebuild_adds_missing_and_zeroes_stale_buckets():
+    client = Client()
+    ingest(client, 'case_18_outbound_gold_3travellers')
+    real = DailyStats.objects.get()
+    stale = DailyStats.objects.create(day=real.day, route='success', plan='Silver', scope='', case_count=4)
+    real.delete()
+
+    call_command('rebuild_stats', stdout=StringIO())
+    stale.refresh_from_db()
+    assert stale.case_count == 0
+    assert DailyStats.objects.get(plan='Gold').case_count == 1
+    call_command('rebuild_stats', check=True, stdout=StringIO())
+
+    buckets = client.get(
+        '/api/v1/stats', {'from': '2025-01-01', 'to': '2026-12-31'},
+        HTTP_X_WEBHOOK_SECRET='test-secret'
+    ).json()['buckets']
+    assert [b['plan'] for b in buckets] == ['Gold']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ingest_during_rebuild_waits_and_is_counted(monkeypatch):
+    client = Client()
+    ingest(client, 'case_18_outbound_gold_3travellers')
+    compute = stats.compute_from_cases
+    threads, late = [], []
+
+    def worker():
+        try:
+            late.append(ingest(Client(), 'case_22_outbound_gold_2travellers'))
+        finally:
+            connection.close()
+
+    def compute_then_let_an_ingest_run():
+        # The scan is done; an ingest finishing now must wait for the rebuild.
+        expected = compute()
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join(timeout=1)
+        threads.append(thread)
+        assert thread.is_alive() and not late
+        return expected
+
+    monkeypatch.setattr(stats, 'compute_from_cases', compute_then_let_an_ingest_run)
+    call_command('rebuild_stats', stdout=StringIO())
+    monkeypatch.setattr(stats, 'compute_from_cases', compute)
+    threads[0].join()
+
+    assert late[0]['route'] == 'success'
+    call_command('rebuild_stats', check=True, stdout=StringIO())